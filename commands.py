@@ -1,11 +1,44 @@
 """
 Undo/Redoコマンド
 """
-from PySide6.QtCore import QPointF
+from PySide6.QtCore import QPointF, QRectF
 from PySide6.QtGui import QUndoCommand
 from node import NodeItem
 
 
+def _scene_rect_of(nodes, connections) -> QRectF:
+    """ノードと接続線を包含するシーン矩形を計算（部分再描画用）"""
+    rect = QRectF()
+    for node in nodes:
+        rect = rect.united(node.cached_scene_rect())
+    for connection in connections:
+        rect = rect.united(connection.scene_bounding_rect())
+    return rect
+
+
+def _connections_of(nodes) -> set:
+    """ノード群に接続された線（重複なし）を収集"""
+    return {connection for node in nodes for connection, _ in node._edges}
+
+
+def _move_nodes_to(view: 'MindMapView', nodes, connections, positions: list[tuple[float, float]]) -> None:
+    """ノード群を指定座標に移動し、関連する接続線と移動前後の領域を更新"""
+    dirty_rect = _scene_rect_of(nodes, connections)
+    # 記録済みの座標を復元するため、移動時のグリッドスナップは適用しない
+    view._restoring_positions = True
+    try:
+        for node, (x, y) in zip(nodes, positions):
+            node.setPos(x, y)
+    finally:
+        view._restoring_positions = False
+    for connection in connections:
+        connection.update_connection()
+    for node in nodes:
+        node.mark_edges_updated()
+    # 移動前後の領域のみ再描画
+    view.scene.update(dirty_rect.united(_scene_rect_of(nodes, connections)))
+
+
 class AddNodeCommand(QUndoCommand):
     """
     ノード追加のアンドゥ・リドゥコマンド
@@ -40,9 +73,8 @@ class AddNodeCommand(QUndoCommand):
         
         # 新しく作成されたノードを選択
         if self.node is not None:
-            # 他のノードの選択を解除
-            for item in self.view.scene.selectedItems():
-                item.setSelected(False)
+            # 他のノードの選択を一括解除
+            self.view.scene.clearSelection()
             # 新しいノードを選択
             self.node.setSelected(True)
             print(f"AddNodeCommand redo完了: ノード作成成功, 位置={self.node.pos()}")
@@ -54,7 +86,7 @@ class AddNodeCommand(QUndoCommand):
         if self.connection is not None:
             self.view.remove_edge(self.connection, self.parent_node, self.node)
         if self.node is not None:
-            self.view.scene.removeItem(self.node)
+            self.view.remove_node(self.node)
 
 
 
@@ -114,22 +146,16 @@ class MoveNodeCommand(QUndoCommand):
     
     def redo(self):
         self.node.setPos(self.new_pos)
-        # 接続線を更新
-        for connection in self.view.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source == self.node or connection.target == self.node)):
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+        # ノードに接続された線のみ更新
+        for connection, _ in self.node._edges:
+            connection.update_connection()
         self.view.scene.update()
     
     def undo(self):
         self.node.setPos(self.old_pos)
-        # 接続線を更新
-        for connection in self.view.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source == self.node or connection.target == self.node)):
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+        # ノードに接続された線のみ更新
+        for connection, _ in self.node._edges:
+            connection.update_connection()
         self.view.scene.update()
 
 
@@ -151,34 +177,24 @@ class MoveMultipleNodesCommand(QUndoCommand):
         super().__init__("複数ノード移動")
         self.view = view
         self.nodes = nodes
-        self.old_positions = [QPointF(pos) for pos in old_positions]
-        self.new_positions = [QPointF(pos) for pos in new_positions]
+        # グリッドスナップでノードごとに移動量が異なるため、各ノードの移動前後の座標をタプルで記録
+        self._old = [(pos.x(), pos.y()) for pos in old_positions]
+        self._new = [(pos.x(), pos.y()) for pos in new_positions]
+        # 移動したノードに関連する接続線を一度だけ収集
+        self._connections = _connections_of(nodes)
+        # push時のredoはドラッグで移動済みの状態で呼ばれるため適用しない
+        self._skip_first_redo = True
     
     def redo(self):
         """複数ノードを新しい位置に移動"""
-        for node, new_pos in zip(self.nodes, self.new_positions):
-            node.setPos(new_pos)
-        
-        # 移動したノードに関連する接続線を更新
-        self._update_connections()
-        self.view.scene.update()
+        if self._skip_first_redo:
+            self._skip_first_redo = False
+            return
+        _move_nodes_to(self.view, self.nodes, self._connections, self._new)
     
     def undo(self):
         """複数ノードを元の位置に戻す"""
-        for node, old_pos in zip(self.nodes, self.old_positions):
-            node.setPos(old_pos)
-        
-        # 移動したノードに関連する接続線を更新
-        self._update_connections()
-        self.view.scene.update()
-    
-    def _update_connections(self):
-        """移動したノードに関連する接続線を更新"""
-        for connection in self.view.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source in self.nodes or connection.target in self.nodes)):
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+        _move_nodes_to(self.view, self.nodes, self._connections, self._old)
 
 
 class MoveNodeWithRelatedCommand(QUndoCommand):
@@ -239,21 +255,8 @@ class MoveNodeWithRelatedCommand(QUndoCommand):
     
     def _find_related_parent_nodes(self, moved_node: 'NodeItem') -> list['NodeItem']:
         """移動したノードに関連する親ノードを特定"""
-        related_nodes = []
-        all_nodes = [item for item in self.view.scene.items() if isinstance(item, 'NodeItem')]
-        
-        # 同じ階層レベルの他の親ノードを特定
-        moved_level = self.view._calculate_node_level(moved_node, all_nodes)
-        
-        for node in all_nodes:
-            if node != moved_node:
-                node_level = self.view._calculate_node_level(node, all_nodes)
-                if node_level == moved_level:
-                    # 右側にあるノードを関連ノードとして追加
-                    if node.pos().x() > moved_node.pos().x():
-                        related_nodes.append(node)
-        
-        return related_nodes
+        # 同じ階層レベルで右側にあるノードを関連ノードとする（レベルはビュー側でキャッシュ）
+        return self.view._get_nodes_right_of(moved_node)
 
 
 class RenameNodeCommand(QUndoCommand):
@@ -299,43 +302,27 @@ class SubtreeMoveCommand(QUndoCommand):
     - undo(): サブツリーの移動取り消し
     """
     
-    def __init__(self, view: 'MindMapView', root_node: 'NodeItem', old_positions: dict, new_positions: dict, old_connections: dict):
+    def __init__(self, view: 'MindMapView', root_node: 'NodeItem', old_positions: dict, new_positions: dict):
         super().__init__("サブツリー移動")
         self.view = view
         self.root_node = root_node
-        self.old_positions = old_positions.copy()
-        self.new_positions = new_positions.copy()
-        self.old_connections = old_connections.copy()
+        self.nodes = list(old_positions)
+        # スナップでノードごとに移動量が異なりうるため各ノードの座標を記録（接続線はノード位置から再計算できる）
+        self._old = [(old_positions[node].x(), old_positions[node].y()) for node in self.nodes]
+        self._new = [(new_positions[node].x(), new_positions[node].y()) for node in self.nodes]
+        # サブツリーのノードに接続された線を一度だけ収集（親ノードへの線を含む）
+        self._connections = _connections_of(self.nodes)
+        # push時のredoはドラッグで移動済みの状態で呼ばれるため適用しない
+        self._skip_first_redo = True
     
     def redo(self):
-        # ノード位置を復元
-        for node, new_pos in self.new_positions.items():
-            node.setPos(new_pos)
-        
-        # 接続線を更新
-        for connection in self.view.connections:
-            if hasattr(connection, 'update_connection'):
-                connection.update_connection()
-        self.view.scene.update()
+        if self._skip_first_redo:
+            self._skip_first_redo = False
+            return
+        _move_nodes_to(self.view, self.nodes, self._connections, self._new)
     
     def undo(self):
-        # ノード位置を元に戻す
-        for node, old_pos in self.old_positions.items():
-            node.setPos(old_pos)
-        
-        # 接続線を元の状態に戻す
-        for connection_id, connection_data in self.old_connections.items():
-            for connection in self.view.connections:
-                if id(connection) == connection_id:
-                    if connection.horizontal_line1 and connection_data.get('horizontal_line1_line'):
-                        connection.horizontal_line1.setLine(connection_data['horizontal_line1_line'])
-                    if connection.vertical_line and connection_data.get('vertical_line_line'):
-                        connection.vertical_line.setLine(connection_data['vertical_line_line'])
-                    if connection.horizontal_line2 and connection_data.get('horizontal_line2_line'):
-                        connection.horizontal_line2.setLine(connection_data['horizontal_line2_line'])
-                    break
-        
-        self.view.scene.update()
+        _move_nodes_to(self.view, self.nodes, self._connections, self._old)
 
 
 class DeleteNodeCommand(QUndoCommand):
@@ -358,27 +345,25 @@ class DeleteNodeCommand(QUndoCommand):
         self.node = node
         self.node_text = node.text_item.toPlainText()
         self.node_pos = node.pos()
-        self.connected_edges: list[tuple['CrankConnection', 'NodeItem', 'NodeItem']] = []
+        self.connected_edges: list[tuple['CrankConnection', 'NodeItem']] = []
     
     def redo(self):
         # 接続されているエッジを記録して削除
         for connection, other_node in self.node._edges:
-            self.connected_edges.append((connection, self.node, other_node))
+            self.connected_edges.append((connection, other_node))
             self.view.remove_edge(connection, self.node, other_node)
         
         # ノードを削除
-        self.view.scene.removeItem(self.node)
+        self.view.remove_node(self.node)
     
     def undo(self):
-        # ノードを復元
-        self.node = self.view.add_node(self.node_text, self.node_pos)
+        # 同じノードを復元（他のコマンドが保持する参照を有効に保つ）
+        self.node.setPos(self.node_pos)
+        self.view.restore_node(self.node)
         
         # 接続を復元
-        for connection, source, target in self.connected_edges:
-            if source == self.node:
-                source.attach_edge(connection, target)
-            else:
-                target.attach_edge(connection, source)
+        for connection, other_node in self.connected_edges:
+            self.view.restore_edge(connection, self.node, other_node)
         self.connected_edges.clear()
 
 
@@ -451,7 +436,7 @@ class AlignGenerationsCommand(QUndoCommand):
     def redo(self):
         """世代整列を実行"""
         # 現在の位置を保存
-        all_nodes = [item for item in self.view.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self.view._node_items
         for node in all_nodes:
             self.old_positions[node] = node.pos()
         
@@ -488,6 +473,8 @@ class NodeShiftCommand(QUndoCommand):
         self.shifted_nodes = shifted_nodes
         self.old_positions = old_positions.copy()
         self.new_positions = new_positions.copy()
+        # シフトしたノードに接続された線を一度だけ収集
+        self._connections = _connections_of(shifted_nodes)
         
     def redo(self):
         """ノードシフトを実行"""
@@ -496,9 +483,8 @@ class NodeShiftCommand(QUndoCommand):
                 node.setPos(self.new_positions[node])
         
         # 接続線を更新
-        for connection in self.view.connections:
-            if hasattr(connection, 'update_connection'):
-                connection.update_connection()
+        for connection in self._connections:
+            connection.update_connection()
         self.view.scene.update()
         
     def undo(self):
@@ -508,7 +494,6 @@ class NodeShiftCommand(QUndoCommand):
                 node.setPos(self.old_positions[node])
         
         # 接続線を更新
-        for connection in self.view.connections:
-            if hasattr(connection, 'update_connection'):
-                connection.update_connection()
+        for connection in self._connections:
+            connection.update_connection()
         self.view.scene.update()
@@ -1,9 +1,19 @@
 """
 接続線関連のクラス
 """
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPen
-from PySide6.QtWidgets import QGraphicsScene, QGraphicsLineItem
+from functools import lru_cache
+
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QPen, QPainterPath
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsPathItem
+
+
+@lru_cache(maxsize=None)
+def _theme_pen(color: str) -> QPen:
+    """テーマの枠線色の接続線用ペンを取得（色ごとに1つだけ生成して共有）"""
+    pen = QPen(QColor(color), 1.0)
+    pen.setStyle(Qt.DashLine)
+    return pen
 
 
 class CrankConnection:
@@ -16,10 +26,10 @@ class CrankConnection:
     - 接続線の削除機能
     - 接続線の視覚的スタイリング
     
-    接続線の構成：
-    - horizontal_line1: 最初の水平線（ソースノードから）
-    - vertical_line: 垂直線（方向転換）
-    - horizontal_line2: 2番目の水平線（ターゲットノードへ）
+    接続線の構成（1つのQGraphicsPathItemで描画）：
+    - 最初の水平線（ソースノードから）
+    - 垂直線（方向転換、X位置はvertical_x）
+    - 2番目の水平線（ターゲットノードへ、終点はend_x）
     
     主要なメソッド：
     - _create_crank_lines(): 接続線の作成
@@ -27,47 +37,48 @@ class CrankConnection:
     - remove(): 接続線の削除
     """
     
-    def __init__(self, scene: QGraphicsScene, source: 'NodeItem', target: 'NodeItem'):
+    # 全接続線で共有するペン（初回作成時に生成）
+    _PEN: QPen | None = None
+    
+    def __init__(self, scene: QGraphicsScene, source: 'NodeItem', target: 'NodeItem', opacity: float = 1.0):
         self.scene = scene
         self.source = source
         self.target = target
-        self.horizontal_line1: QGraphicsLineItem | None = None  # 最初の水平線
-        self.vertical_line: QGraphicsLineItem | None = None      # 垂直線
-        self.horizontal_line2: QGraphicsLineItem | None = None  # 2番目の水平線
-        self._create_crank_lines()
+        self.path_item: QGraphicsPathItem | None = None  # クランク状の線全体
+        self.vertical_x: float = 0.0  # 垂直線のX位置
+        self.end_x: float = 0.0       # 2番目の水平線の終点X
+        self._last_geom: tuple | None = None  # 前回設定した線の座標
+        self._create_crank_lines(opacity)
     
-    def _create_crank_lines(self):
+    def _create_crank_lines(self, opacity: float = 1.0):
         """3段階クランク状の線を作成"""
-        # 線のスタイル設定
-        pen = QPen(Qt.darkGray, 1.0)
-        pen.setStyle(Qt.DashLine)
-        
-        # 3本の線を作成
-        self.horizontal_line1 = QGraphicsLineItem()
-        self.vertical_line = QGraphicsLineItem()
-        self.horizontal_line2 = QGraphicsLineItem()
+        # 線のスタイル設定（接続線ごとに生成せず共有する）
+        if CrankConnection._PEN is None:
+            pen = QPen(Qt.darkGray, 1.0)
+            pen.setStyle(Qt.DashLine)
+            CrankConnection._PEN = pen
         
-        # スタイルを適用
-        for line in [self.horizontal_line1, self.vertical_line, self.horizontal_line2]:
-            line.setPen(pen)
-            line.setZValue(-1)  # ノードの後ろに表示
+        # 3段階の線を1つのパスとして作成
+        self.path_item = QGraphicsPathItem()
+        self.path_item.setPen(CrankConnection._PEN)
+        self.path_item.setZValue(-1)  # ノードの後ろに表示
+        # 透明度はシーンに追加する前に1つのパスに1回だけ設定する
+        self.path_item.setOpacity(opacity)
         
         # シーンに追加
-        self.scene.addItem(self.horizontal_line1)
-        self.scene.addItem(self.vertical_line)
-        self.scene.addItem(self.horizontal_line2)
+        self.scene.addItem(self.path_item)
         
         # 初期位置を設定
         self.update_connection()
     
     def update_connection(self):
         """接続線の位置を更新"""
-        if not all([self.horizontal_line1, self.vertical_line, self.horizontal_line2]):
+        if not self.path_item:
             return
         
         # ノードの境界を取得
-        source_rect = self.source.sceneBoundingRect()
-        target_rect = self.target.sceneBoundingRect()
+        source_rect = self.source.cached_scene_rect()
+        target_rect = self.target.cached_scene_rect()
         
         # 接続点を計算（右端と左端）
         start_x = source_rect.right()
@@ -76,7 +87,7 @@ class CrankConnection:
         end_y = target_rect.center().y()
         
         # 垂直線のX位置を統一
-        vertical_x = self._get_unified_vertical_x_position()
+        vertical_x = self._get_unified_vertical_x_position(source_rect)
         
         # horizontal_line2が必ず右方向（プラス方向）に向くように調整
         # ターゲットが垂直線より左にある場合は、ターゲットの右端を使用
@@ -91,37 +102,47 @@ class CrankConnection:
         if end_x < vertical_x:
             end_x = vertical_x + 30
         
-        # 3段階の線を設定
-        self.horizontal_line1.setLine(start_x, start_y, vertical_x, start_y)
-        self.vertical_line.setLine(vertical_x, start_y, vertical_x, end_y)
-        self.horizontal_line2.setLine(vertical_x, end_y, end_x, end_y)
+        # 座標が変わっていなければパスを再設定しない
+        geom = (start_x, start_y, vertical_x, end_x, end_y)
+        if geom == self._last_geom:
+            return
+        self._last_geom = geom
+        
+        # 3段階の線を1つのパスで設定
+        path = QPainterPath()
+        path.moveTo(start_x, start_y)
+        path.lineTo(vertical_x, start_y)
+        path.lineTo(vertical_x, end_y)
+        path.lineTo(end_x, end_y)
+        self.path_item.setPath(path)
+        self.vertical_x = vertical_x
+        self.end_x = end_x
+    
+    def scene_bounding_rect(self) -> QRectF:
+        """接続線全体のシーン上の境界矩形を取得"""
+        if not self.path_item:
+            return QRectF()
+        return self.path_item.sceneBoundingRect()
     
-    def _get_unified_vertical_x_position(self):
+    def _get_unified_vertical_x_position(self, source_rect: QRectF):
         """統一された垂直線のX位置を取得"""
         # 基本位置 + 20の固定オフセット
-        return self.source.sceneBoundingRect().right() + 20
+        return source_rect.right() + 20
     
     def remove(self):
         """接続線を削除"""
-        if self.horizontal_line1:
-            self.scene.removeItem(self.horizontal_line1)
-        if self.vertical_line:
-            self.scene.removeItem(self.vertical_line)
-        if self.horizontal_line2:
-            self.scene.removeItem(self.horizontal_line2)
+        if self.path_item:
+            self.scene.removeItem(self.path_item)
+    
+    def restore(self):
+        """削除した接続線をシーンに戻す"""
+        if self.path_item and self.path_item.scene() is None:
+            self.scene.addItem(self.path_item)
+        self.update_connection()
 
     def update_theme(self, theme: dict):
         """テーマを更新"""
         if "node_border" in theme:
-            from PySide6.QtGui import QColor
-            # 接続線の色を更新
-            pen = QPen(QColor(theme["node_border"]), 1.0)
-            pen.setStyle(Qt.DashLine)
-            
-            if self.horizontal_line1:
-                self.horizontal_line1.setPen(pen)
-            if self.vertical_line:
-                self.vertical_line.setPen(pen)
-            if self.horizontal_line2:
-                self.horizontal_line2.setPen(pen)
-
+            # 接続線の色を更新（同じ色のペンは全接続線で共有）
+            if self.path_item:
+                self.path_item.setPen(_theme_pen(theme["node_border"]))
@@ -1,29 +1,30 @@
 """
 ダイアログ関連のクラス
 """
-from PySide6.QtCore import Qt
+from functools import partial
+
+from PySide6.QtCore import Qt, QSignalBlocker
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
     QHBoxLayout,
     QSlider,
+    QDoubleSpinBox,
     QLabel,
     QPushButton,
 )
 
-
 class ZoomSpeedDialog(QDialog):
     """
     ズーム速度設定ダイアログクラス
     
     このクラスは以下の機能を提供します：
     - ズーム速度の設定UI
-    - スライダーによる速度調整（1-200の範囲）
-    - 現在の速度の表示（パーセンテージ）
+    - スピンボックスによる倍率調整（1.001-1.200倍、0.005刻み）
     - 設定値の取得機能
     
     主要なメソッド：
-    - _on_slider_changed(): スライダー値変更時の処理
+    - set_zoom_speed(): 表示するズーム速度の設定
     - get_zoom_speed(): 設定されたズーム速度の取得
     """
     
@@ -35,21 +36,19 @@ class ZoomSpeedDialog(QDialog):
         
         layout = QVBoxLayout()
         
-        # スライダー
-        self.slider = QSlider(Qt.Horizontal)
-        self.slider.setMinimum(1)  # 0.1% (0.1%刻み)
-        self.slider.setMaximum(200)  # 20% (0.1%刻み)
-        # 中央を100%にするため、スライダー値200が100%になるように調整
-        # デフォルト20%はスライダー値200に対応（現在の中央値が最大100%）
-        slider_value = int((current_speed - 1.0) * 1000)  # 20% = スライダー値200
-        self.slider.setValue(slider_value)
-        self.slider.valueChanged.connect(self._on_slider_changed)
-        layout.addWidget(self.slider)
-        
-        # パーセント表示ラベル
-        self.percent_label = QLabel()
-        self._on_slider_changed(self.slider.value())
-        layout.addWidget(self.percent_label)
+        # ズーム倍率（1ステップあたり）を小数のまま保持するスピンボックス
+        speed_layout = QHBoxLayout()
+        speed_layout.addWidget(QLabel("ズーム倍率:"))
+        self.spin = QDoubleSpinBox()
+        self.spin.setDecimals(3)
+        self.spin.setRange(1.001, 1.200)
+        self.spin.setSingleStep(0.005)
+        self.spin.setSuffix("×")
+        # 入力中は値を確定せず、編集完了時のみ反映する
+        self.spin.setKeyboardTracking(False)
+        self.spin.setValue(current_speed)
+        speed_layout.addWidget(self.spin)
+        layout.addLayout(speed_layout)
         
         # ボタン
         button_layout = QHBoxLayout()
@@ -67,17 +66,14 @@ class ZoomSpeedDialog(QDialog):
         # 初期値保存
         self.initial_speed = current_speed
     
-    def _on_slider_changed(self, value):
-        """スライダー値変更時の処理"""
-        # スライダー値200が100%として表示されるように調整（現在の20%が最大100%に対応）
-        percent = (value / 200.0) * 100.0  # スライダー値200で100%として表示
-        self.percent_label.setText(f"{percent:.1f}%")
+    def set_zoom_speed(self, speed):
+        """ダイアログ再表示時に現在のズーム速度を反映"""
+        self.spin.setValue(speed)
+        self.initial_speed = speed
     
     def get_zoom_speed(self):
         """設定されたズーム速度を取得"""
-        # 実際のズーム速度は変更せず、表示のみ調整
-        percent = self.slider.value() * 0.1  # スライダー値200で20%の実際の速度
-        return 1.0 + (percent / 100.0)
+        return self.spin.value()
 
 
 class TransparencyDialog(QDialog):
@@ -85,14 +81,15 @@ class TransparencyDialog(QDialog):
     透明度設定ダイアログクラス
     
     このクラスは以下の機能を提供します：
-    - ノードの透明度設定UI
-    - スライダーによる透明度調整（0-255の範囲）
+    - ウィンドウ・背景・ノード・接続線の透明度設定UI
+    - スライダーによる透明度調整（0-100%の範囲）
     - 現在の透明度の表示（パーセンテージ）
     - 設定値の取得機能
     
     主要なメソッド：
-    - _on_slider_changed(): スライダー値変更時の処理
-    - get_transparency(): 設定された透明度の取得
+    - _update_label(): スライダー値変更時のラベル更新
+    - set_transparencies(): 表示する透明度の一括設定
+    - get_window_transparency() などの各getter: 設定された透明度の取得
     """
     
     def __init__(self, parent=None, bg_transparency=1.0, node_transparency=1.0, line_transparency=1.0, window_transparency=1.0):
@@ -110,9 +107,9 @@ class TransparencyDialog(QDialog):
         self.window_slider.setMinimum(10)
         self.window_slider.setMaximum(100)
         self.window_slider.setValue(int(window_transparency * 100))
-        self.window_slider.valueChanged.connect(self._on_window_slider_changed)
         window_layout.addWidget(self.window_slider)
         self.window_label = QLabel(f"{int(window_transparency * 100)}%")
+        self._connect_slider(self.window_slider, self.window_label)
         window_layout.addWidget(self.window_label)
         layout.addLayout(window_layout)
         
@@ -123,9 +120,9 @@ class TransparencyDialog(QDialog):
         self.bg_slider.setMinimum(0)
         self.bg_slider.setMaximum(100)
         self.bg_slider.setValue(int(bg_transparency * 100))
-        self.bg_slider.valueChanged.connect(self._on_bg_slider_changed)
         bg_layout.addWidget(self.bg_slider)
         self.bg_label = QLabel(f"{int(bg_transparency * 100)}%")
+        self._connect_slider(self.bg_slider, self.bg_label)
         bg_layout.addWidget(self.bg_label)
         layout.addLayout(bg_layout)
         
@@ -136,9 +133,9 @@ class TransparencyDialog(QDialog):
         self.node_slider.setMinimum(0)
         self.node_slider.setMaximum(100)
         self.node_slider.setValue(int(node_transparency * 100))
-        self.node_slider.valueChanged.connect(self._on_node_slider_changed)
         node_layout.addWidget(self.node_slider)
         self.node_label = QLabel(f"{int(node_transparency * 100)}%")
+        self._connect_slider(self.node_slider, self.node_label)
         node_layout.addWidget(self.node_label)
         layout.addLayout(node_layout)
         
@@ -154,9 +151,9 @@ class TransparencyDialog(QDialog):
         self.line_slider.setMinimum(10)
         self.line_slider.setMaximum(100)
         self.line_slider.setValue(int(line_transparency * 100))
-        self.line_slider.valueChanged.connect(self._on_line_slider_changed)
         line_layout.addWidget(self.line_slider)
         self.line_label = QLabel(f"{int(line_transparency * 100)}%")
+        self._connect_slider(self.line_slider, self.line_label)
         line_layout.addWidget(self.line_label)
         layout.addLayout(line_layout)
         
@@ -173,21 +170,30 @@ class TransparencyDialog(QDialog):
         layout.addLayout(button_layout)
         self.setLayout(layout)
     
-    def _on_window_slider_changed(self, value):
-        """ウィンドウ透明度スライダー変更"""
-        self.window_label.setText(f"{value}%")
-    
-    def _on_bg_slider_changed(self, value):
-        """背景透明度スライダー変更"""
-        self.bg_label.setText(f"{value}%")
-    
-    def _on_node_slider_changed(self, value):
-        """ノード透明度スライダー変更"""
-        self.node_label.setText(f"{value}%")
-    
-    def _on_line_slider_changed(self, value):
-        """接続線透明度スライダー変更"""
-        self.line_label.setText(f"{value}%")
+    def _connect_slider(self, slider: QSlider, label: QLabel):
+        """スライダーとパーセント表示ラベルを接続（ドラッグ中はsliderMovedのみで更新）"""
+        slider.setTracking(False)
+        update_label = partial(self._update_label, label)
+        slider.valueChanged.connect(update_label)
+        slider.sliderMoved.connect(update_label)
+    
+    @staticmethod
+    def _update_label(label: QLabel, value: int):
+        """パーセント表示ラベルを更新"""
+        label.setText(f"{value}%")
+    
+    def set_transparencies(self, bg_transparency, node_transparency, line_transparency, window_transparency):
+        """ダイアログ再表示時に現在の透明度を反映"""
+        self._set_slider_value(self.window_slider, self.window_label, window_transparency)
+        self._set_slider_value(self.bg_slider, self.bg_label, bg_transparency)
+        self._set_slider_value(self.node_slider, self.node_label, node_transparency)
+        self._set_slider_value(self.line_slider, self.line_label, line_transparency)
+    
+    def _set_slider_value(self, slider: QSlider, label: QLabel, transparency: float):
+        """シグナルを発生させずにスライダー値を設定し、ラベルを1回だけ更新"""
+        with QSignalBlocker(slider):
+            slider.setValue(int(transparency * 100))
+        self._update_label(label, slider.value())
     
     def get_window_transparency(self):
         """ウィンドウ透明度を取得"""
@@ -1,11 +1,16 @@
 """
 マインドマップアプリケーション - メインファイル
+
+シグナル接続は必ず新形式（signal.connect(slot)）で行うこと（dialogs参照）。
 """
 import sys
 import json
 import os
-from PySide6.QtCore import QPointF, Qt, QSettings
-from PySide6.QtGui import QAction, QKeySequence
+import logging
+from string import Template
+from operator import attrgetter
+from PySide6.QtCore import QPointF, Qt, QSettings, QTimer, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QAction, QActionGroup, QColor, QCursor, QKeySequence, QPalette, QUndoStack
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -13,12 +18,136 @@ from PySide6.QtWidgets import (
     QFileDialog,
     QMessageBox,
     QDialog,
+    QMenu,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QListWidget,
+    QListWidgetItem,
+    QLabel,
 )
 
 from view import MindMapView
+from commands import AddNodeCommand
 from dialogs import ZoomSpeedDialog, TransparencyDialog
 
+log = logging.getLogger(__name__)
+
+
+# 設定（QSettings）の保存先とキー
+SETTINGS_ORGANIZATION = "MindMapApp"
+SETTINGS_APPLICATION = "ToolbarSettings"
+KEY_ACTION_ORDER = "action_order"
+KEY_TOOLBAR_GEOMETRY = "toolbar_geometry"
+KEY_TOOLBAR_FLOATING = "toolbar_floating"
+KEY_TOOLBAR_AREA = "toolbar_area"
+KEY_UNDO_LIMIT = "undo_limit"
+# ツールバーのリセット時に削除するキー（Undo上限などツールバー以外の設定は残す）
+TOOLBAR_SETTING_KEYS = (KEY_ACTION_ORDER, KEY_TOOLBAR_GEOMETRY, KEY_TOOLBAR_FLOATING, KEY_TOOLBAR_AREA)
+
+# メインツールバーのobjectName（スタイルシートのセレクタにも使用）
+MAIN_TOOLBAR_NAME = "mainToolBar"
+
+# テーマ用スタイルシートのテンプレート（themes/*.qss、起動時に1回だけ読み込む）
+THEMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes")
+
+
+def _load_qss_template(file_name: str) -> str:
+    """テーマ用スタイルシートのテンプレートを読み込む"""
+    with open(os.path.join(THEMES_DIR, file_name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+_TOOLBAR_QSS_TEMPLATE = Template(_load_qss_template("toolbar.qss"))
+
+# ツールバーのボタングループ（グループの境界にセパレーターを入れる）
+TOOLBAR_GROUPS = (
+    ("undo_action", "redo_action"),
+    ("add_node_action", "select_all_action", "connect_mode_action", "delete_action"),
+    ("fit_action", "auto_fit_action", "attraction_action", "zoom_speed_action"),
+    ("transparency_action", "appearance_action", "grid_action", "grid_snap_action"),
+    ("align_action",),
+    ("save_action", "load_action"),
+)
+_TOOLBAR_GROUP_OF = {name: index for index, names in enumerate(TOOLBAR_GROUPS) for name in names}
+
+# Undo履歴の上限（設定 KEY_UNDO_LIMIT で変更可能）
+DEFAULT_UNDO_LIMIT = 200
+
+# ツールバー状態の保存を遅延させる時間（ミリ秒）
+TOOLBAR_SAVE_DELAY_MS = 500
+
+# 保存時の書き込みバッファサイズ（1 MiB）
+SAVE_BUFFER_SIZE = 1 << 20
+
+# メインウィンドウのスタイルシート（インスタンスごとに文字列を組み立てない）
+# ツールバー周りの色は従来の半透明色をウィンドウ背景(#f0f0f0)に合成した不透明色にしている
+_MAIN_STYLESHEET = """
+    QMainWindow { 
+        border: none; 
+    }
+    QToolBar { 
+        background: #f0f0f0; 
+        border: none; 
+        border-radius: 5px; 
+    }
+    QToolButton { 
+        background: #f6f6f6; 
+        border: 1px solid #e7e7e7; 
+        border-radius: 3px; 
+        padding: 5px; 
+    }
+    QToolButton:hover { 
+        background: #f9f9f9; 
+    }
+    QToolButton:pressed { 
+        background: #d8d8d8; 
+    }
+    QToolButton:checked { 
+        background: #8db1fb; 
+        border: 2px solid #5b82d1; 
+        color: white; 
+    }
+    QToolButton:checked:hover { 
+        background: #92b9fc; 
+    }
+"""
+
+
+def _intern_theme_strings(themes: dict) -> dict:
+    """テーマの文字列を intern し、同じ色の文字列を1つのオブジェクトで共有する（起動時に1回だけ）"""
+    for theme in themes.values():
+        for key, value in theme.items():
+            if isinstance(value, str):
+                theme[key] = sys.intern(value)
+    return themes
+
 
+class _LoadSignals(QObject):
+    """読み込みワーカーからメインスレッドへの通知用シグナル"""
+    finished = Signal(str, object)  # ファイルパス, 解析済みのデータ
+    failed = Signal(str, str)    # ファイルパス, エラーメッセージ
+
+
+class _MindMapLoader(QRunnable):
+    """マインドマップファイルをバックグラウンドで読み込むワーカー"""
+    
+    def __init__(self, file_path: str):
+        super().__init__()
+        self.file_path = file_path
+        # シグナルはメインスレッドで生成したQObjectに持たせ、結果はキュー経由で受け取る
+        self.signals = _LoadSignals()
+    
+    def run(self):
+        """ファイルを読み込んで解析する（ワーカースレッドで実行）"""
+        try:
+            # 文字列を経由せずファイルから直接解析する
+            with open(self.file_path, 'rb') as f:
+                data = json.load(f)
+        except Exception as e:
+            self.signals.failed.emit(self.file_path, str(e))
+            return
+        self.signals.finished.emit(self.file_path, data)
 
 
 class MainWindow(QMainWindow):
@@ -31,7 +160,7 @@ class MainWindow(QMainWindow):
     - ノードの追加・削除・編集機能
     - ズーム・透明度・グリッドの設定
     - ファイルの保存・読み込み機能
-    - アンドゥ・リドゥ機能の管理
+    - アンドゥ・リドゥ機能の管理（履歴は上限件数まで保持し、超えた分は古い順にQtが破棄）
     
     主要なメソッド：
     - _add_node(): ノードの追加処理
@@ -42,6 +171,94 @@ class MainWindow(QMainWindow):
     """
     """メインウィンドウ"""
     
+    # アプリ全体のスタイルシートを適用済みか
+    _qss_applied = False
+    
+    # 配色テーマ定義（全ウィンドウで共有する静的データ）
+    THEMES = _intern_theme_strings({
+        "default": {
+            "name": "デフォルト",
+            "background": "#f0f0f0",
+            "node_bg": "#ffffff",
+            "node_border": "#333333",
+            "text_color": "#000000",
+            "toolbar_bg": "#e0e0e0",
+            "button_bg": "#ffffff",
+            "button_hover": "#e0e0e0",
+            "button_checked": "#0078d4",
+            "button_checked_text": "#ffffff"
+        },
+        "gray": {
+            "name": "目にやさしいグレー",
+            "background": "#2b2b2b",
+            "node_bg": "#3c3c3c",
+            "node_border": "#666666",
+            "text_color": "#ffffff",
+            "toolbar_bg": "#1e1e1e",
+            "button_bg": "#3c3c3c",
+            "button_hover": "#4c4c4c",
+            "button_checked": "#0078d4",
+            "button_checked_text": "#ffffff"
+        },
+        "pastel": {
+            "name": "明るいパステル",
+            "background": "#f8f9fa",
+            "node_bg": "#ffffff",
+            "node_border": "#e1e5e9",
+            "text_color": "#2c3e50",
+            "toolbar_bg": "#e9ecef",
+            "button_bg": "#ffffff",
+            "button_hover": "#f1f3f4",
+            "button_checked": "#6c5ce7",
+            "button_checked_text": "#ffffff"
+        }
+    })
+    
+    # テーマごとに組み立て済みのスタイルシート
+    _stylesheet_cache: dict[str, str] = {}
+    
+    # ショートカット定義ごとのQKeySequenceキャッシュ
+    # （標準キーの解決にはQApplicationが必要なため、モジュール読み込み時ではなく初回使用時に生成）
+    _key_sequence_cache: dict = {}
+    
+    # ツールバーのアクション定義
+    # (表示名, objectName, ショートカット, スロット名, ステータスチップ, チェック初期値)
+    # チェック初期値が None のものは通常のアクション（triggered に接続）、
+    # True/False のものはチェック可能なアクション（toggled に接続）
+    # スロット名が "view." で始まるものはビューのメソッドを呼び出す
+    _ACTION_SPECS = (
+        ("ノード追加", "add_node_action", Qt.Key_Tab, "_add_node",
+         "新しいノードを中央に追加 (Tabキー)", None),
+        ("全選択", "select_all_action", QKeySequence.SelectAll, "view._select_all_nodes",
+         "全てのノードを選択 (Cmd+A)", None),
+        ("接続モード", "connect_mode_action", None, "_toggle_connect_mode",
+         "Shiftキーを押しながらノードをクリックして接続", False),
+        ("フィット", "fit_action", None, "view.fit_all_nodes",
+         "全てのノードが画面に収まるように調整", None),
+        ("オートフィット", "auto_fit_action", None, "_toggle_auto_fit",
+         "ノード追加時に自動的に画面に収まるように調整", False),
+        ("アトラクション", "attraction_action", None, "_toggle_attraction",
+         "全てのノードをランダムに動かす (ESCで終了)", False),
+        ("ズーム速度", "zoom_speed_action", None, "_show_zoom_speed_dialog",
+         "ズーム速度を調整", None),
+        ("透明度", "transparency_action", None, "_show_transparency_dialog",
+         "透明度を調整", None),
+        ("アピアランス", "appearance_action", None, "_show_appearance_menu",
+         "UI配色テーマを選択", None),
+        ("グリッド", "grid_action", None, "_toggle_grid",
+         "グリッドの表示/非表示", False),
+        ("グリッドスナップ", "grid_snap_action", None, "_toggle_grid_snap",
+         "グリッドスナップのON/OFF", True),
+        ("整理", "align_action", None, "view.align_generations_and_avoid_line_overlap",
+         "同世代の左端Xを揃え、接続線の重なりを回避", None),
+        ("削除", "delete_action", (QKeySequence.Delete, Qt.Key_Backspace), "_delete_selected_nodes",
+         "選択されたノードを削除", None),
+        ("保存", "save_action", QKeySequence.Save, "_save_mindmap",
+         "マインドマップを保存", None),
+        ("読み込み", "load_action", QKeySequence.Open, "_load_mindmap",
+         "マインドマップを読み込み", None),
+    )
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Mind Map (PySide6)")
@@ -52,92 +269,50 @@ class MainWindow(QMainWindow):
         
         # テーマの初期設定
         self.current_theme = "default"
-        self.themes = {
-            "default": {
-                "name": "デフォルト",
-                "background": "#f0f0f0",
-                "node_bg": "#ffffff",
-                "node_border": "#333333",
-                "text_color": "#000000",
-                "toolbar_bg": "#e0e0e0",
-                "button_bg": "#ffffff",
-                "button_hover": "#e0e0e0",
-                "button_checked": "#0078d4",
-                "button_checked_text": "#ffffff"
-            },
-            "gray": {
-                "name": "目にやさしいグレー",
-                "background": "#2b2b2b",
-                "node_bg": "#3c3c3c",
-                "node_border": "#666666",
-                "text_color": "#ffffff",
-                "toolbar_bg": "#1e1e1e",
-                "button_bg": "#3c3c3c",
-                "button_hover": "#4c4c4c",
-                "button_checked": "#0078d4",
-                "button_checked_text": "#ffffff"
-            },
-            "pastel": {
-                "name": "明るいパステル",
-                "background": "#f8f9fa",
-                "node_bg": "#ffffff",
-                "node_border": "#e1e5e9",
-                "text_color": "#2c3e50",
-                "toolbar_bg": "#e9ecef",
-                "button_bg": "#ffffff",
-                "button_hover": "#f1f3f4",
-                "button_checked": "#6c5ce7",
-                "button_checked_text": "#ffffff"
-            }
-        }
+        # 最後にビューへ適用したテーマの配色（変更分のみをビューに渡すため）
+        self._last_theme_applied_to_view: dict = {}
 
         self.view = MindMapView(self)
         self.setCentralWidget(self.view)
         
-        # macOS用の背景透明化設定
-        self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self.setAttribute(Qt.WA_NoSystemBackground, True)
-        
-        # ウィンドウのスタイルシートも設定（OSのデスクトップが透けて見えるように）
-        self.setStyleSheet("""
-            QMainWindow { 
-                background: transparent; 
-                border: none; 
-            }
-            QToolBar { 
-                background: rgba(240, 240, 240, 150); 
-                border: none; 
-                border-radius: 5px; 
-            }
-            QToolButton { 
-                background: rgba(255, 255, 255, 100); 
-                border: 1px solid rgba(200, 200, 200, 60); 
-                border-radius: 3px; 
-                padding: 5px; 
-            }
-            QToolButton:hover { 
-                background: rgba(255, 255, 255, 150); 
-            }
-            QToolButton:pressed { 
-                background: rgba(200, 200, 200, 150); 
-            }
-            QToolButton:checked { 
-                background: rgba(100, 150, 255, 180); 
-                border: 2px solid rgba(50, 100, 200, 200); 
-                color: white; 
-            }
-            QToolButton:checked:hover { 
-                background: rgba(120, 170, 255, 200); 
-            }
-        """)
+        # ウィンドウは不透明に描画する（ツールバーの配色も事前に合成済みの不透明色）
+        # （トップレベルの WA_TranslucentBackground は全面のアルファ合成を招くため使わない）
+        # スタイルシートはアプリ全体に1回だけ適用し、ツールバー再作成時も再解析させない
+        if not MainWindow._qss_applied:
+            QApplication.instance().setStyleSheet(_MAIN_STYLESHEET)
+            MainWindow._qss_applied = True
+        # ウィンドウ全体のフェードは setWindowOpacity で行う
+        self.setWindowOpacity(self.transparency)
+        # ウィンドウの背景色・文字色はパレットで設定（スタイルシートの再解析を伴わない）
+        self._apply_theme_palette(self.THEMES[self.current_theme])
         
         # ビューにフォーカスを設定
         self.view.setFocusPolicy(Qt.StrongFocus)
         self.view.setFocus()
 
+        # 設定ダイアログ（初回表示時に作成して再利用）
+        self._zoom_dialog: ZoomSpeedDialog | None = None
+        self._transparency_dialog: TransparencyDialog | None = None
+        self._transparency_dialog_open = False  # 透明度ダイアログの多重表示防止
+        
+        # 実行中の読み込みワーカー（完了まで参照を保持）
+        self._loader: _MindMapLoader | None = None
+        
+        # 設定は1つのQSettingsを使い回す
+        self._settings = QSettings(SETTINGS_ORGANIZATION, SETTINGS_APPLICATION)
+        
+        # ツールバー状態の保存は短時間の連続操作をまとめて1回にする
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(TOOLBAR_SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._do_save_toolbar_state)
+        self._toolbar_dirty = False  # 未保存のツールバー変更があるか
+
         # Undoスタック
-        from PySide6.QtGui import QUndoStack
         self.undo_stack = QUndoStack(self)
+        # 履歴の上限（超えた分は古いコマンドから破棄され、保持していたノード参照も解放される）
+        undo_limit = self._settings.value(KEY_UNDO_LIMIT, DEFAULT_UNDO_LIMIT, type=int)
+        self.undo_stack.setUndoLimit(undo_limit)
         self.view.undo_stack = self.undo_stack
 
         # 中心ノード（起動時に選択状態）
@@ -147,7 +322,11 @@ class MainWindow(QMainWindow):
         # 背景を透明に設定
         self.view.set_background_transparency(0.0)
         
-        # ツールバー
+        # テーマ選択メニュー（開かれない場合もあるため、初回表示時に作成）
+        self._theme_menu: QMenu | None = None
+        
+        # ツールバー（テーマ変更時はツールバー専用のスタイルシートを設定する）
+        self._toolbar_stylesheet = ""
         self._create_toolbar()
         
         # ツールバーの設定を復元（アクション順番のみ）
@@ -156,6 +335,9 @@ class MainWindow(QMainWindow):
     def _create_toolbar(self):
         """ツールバーを作成"""
         toolbar = QToolBar("Tools", self)
+        toolbar.setObjectName(MAIN_TOOLBAR_NAME)
+        if self._toolbar_stylesheet:
+            toolbar.setStyleSheet(self._toolbar_stylesheet)
         
         # ツールバーのドラッグ&ドロップ機能を有効にする
         toolbar.setMovable(True)  # ツールバー自体の移動を有効
@@ -173,325 +355,171 @@ class MainWindow(QMainWindow):
         # Undo/Redo アクション
         undo_action = self.undo_stack.createUndoAction(self, "取り消し")
         undo_action.setShortcut(QKeySequence.Undo)
+        undo_action.setShortcutContext(Qt.WindowShortcut)
         undo_action.setObjectName("undo_action")
         redo_action = self.undo_stack.createRedoAction(self, "やり直し")
         redo_action.setShortcut(QKeySequence.Redo)
+        redo_action.setShortcutContext(Qt.WindowShortcut)
         redo_action.setObjectName("redo_action")
         toolbar.addAction(undo_action)
         toolbar.addAction(redo_action)
 
-        # ノード追加
-        action_add = QAction("ノード追加", self)
-        action_add.setStatusTip("新しいノードを中央に追加 (Tabキー)")
-        action_add.setShortcut(QKeySequence(Qt.Key_Tab))
-        action_add.setObjectName("add_node_action")
-        action_add.triggered.connect(self._add_node)
-        toolbar.addAction(action_add)
-
-        # キューブノード追加
-
-        # 全選択
-        action_select_all = QAction("全選択", self)
-        action_select_all.setStatusTip("全てのノードを選択 (Cmd+A)")
-        action_select_all.setShortcut(QKeySequence.SelectAll)
-        action_select_all.setObjectName("select_all_action")
-        action_select_all.triggered.connect(self.view._select_all_nodes)
-        toolbar.addAction(action_select_all)
-
-        # 接続モード
-        action_connect = QAction("接続モード", self)
-        action_connect.setCheckable(True)
-        action_connect.setChecked(False)
-        action_connect.setStatusTip("Shiftキーを押しながらノードをクリックして接続")
-        action_connect.setObjectName("connect_mode_action")
-        action_connect.toggled.connect(self._toggle_connect_mode)
-        toolbar.addAction(action_connect)
-
-        # フィット
-        action_fit = QAction("フィット", self)
-        action_fit.setStatusTip("全てのノードが画面に収まるように調整")
-        action_fit.setObjectName("fit_action")
-        action_fit.triggered.connect(self.view.fit_all_nodes)
-        toolbar.addAction(action_fit)
-
-        # オートフィット
-        action_auto_fit = QAction("オートフィット", self)
-        action_auto_fit.setCheckable(True)
-        action_auto_fit.setChecked(False)
-        action_auto_fit.setStatusTip("ノード追加時に自動的に画面に収まるように調整")
-        action_auto_fit.toggled.connect(self._toggle_auto_fit)
-        toolbar.addAction(action_auto_fit)
-
-        # アトラクション
-        action_attraction = QAction("アトラクション", self)
-        action_attraction.setCheckable(True)
-        action_attraction.setChecked(False)
-        action_attraction.setStatusTip("全てのノードをランダムに動かす (ESCで終了)")
-        action_attraction.toggled.connect(self._toggle_attraction)
-        toolbar.addAction(action_attraction)
-
-        # ズーム速度
-        action_zoom_speed = QAction("ズーム速度", self)
-        action_zoom_speed.setStatusTip("ズーム速度を調整")
-        action_zoom_speed.triggered.connect(self._show_zoom_speed_dialog)
-        toolbar.addAction(action_zoom_speed)
-
-        # 透明度
-        action_transparency = QAction("透明度", self)
-        action_transparency.setStatusTip("透明度を調整")
-        action_transparency.triggered.connect(self._show_transparency_dialog)
-        toolbar.addAction(action_transparency)
-
-        # アピアランス
-        action_appearance = QAction("アピアランス", self)
-        action_appearance.setStatusTip("UI配色テーマを選択")
-        action_appearance.triggered.connect(self._show_appearance_menu)
-        toolbar.addAction(action_appearance)
-
-        # グリッド
-        action_grid = QAction("グリッド", self)
-        action_grid.setCheckable(True)
-        action_grid.setStatusTip("グリッドの表示/非表示")
-        action_grid.toggled.connect(self._toggle_grid)
-        toolbar.addAction(action_grid)
-
-        # グリッドスナップ
-        action_grid_snap = QAction("グリッドスナップ", self)
-        action_grid_snap.setCheckable(True)
-        action_grid_snap.setChecked(True)  # デフォルトでオン
-        action_grid_snap.setStatusTip("グリッドスナップのON/OFF")
-        action_grid_snap.toggled.connect(self._toggle_grid_snap)
-        toolbar.addAction(action_grid_snap)
-
-        # 整理（整列）
-        action_align = QAction("整理", self)
-        action_align.setStatusTip("同世代の左端Xを揃え、接続線の重なりを回避")
-        action_align.setObjectName("align_action")
-        action_align.triggered.connect(self.view.align_generations_and_avoid_line_overlap)
-        toolbar.addAction(action_align)
-
-        # 削除
-        action_delete = QAction("削除", self)
-        action_delete.setStatusTip("選択されたノードを削除")
-        action_delete.setShortcuts([QKeySequence.Delete, QKeySequence(Qt.Key_Backspace)])
-        action_delete.setObjectName("delete_action")
-        action_delete.triggered.connect(self._delete_selected_nodes)
-        toolbar.addAction(action_delete)
-
-        # 保存
-        action_save = QAction("保存", self)
-        action_save.setStatusTip("マインドマップを保存")
-        action_save.setShortcut(QKeySequence.Save)
-        action_save.setObjectName("save_action")
-        action_save.triggered.connect(self._save_mindmap)
-        toolbar.addAction(action_save)
-
-        # 読み込み
-        action_load = QAction("読み込み", self)
-        action_load.setStatusTip("マインドマップを読み込み")
-        action_load.setShortcut(QKeySequence.Open)
-        action_load.setObjectName("load_action")
-        action_load.triggered.connect(self._load_mindmap)
-        toolbar.addAction(action_load)
+        # 定義表に従ってアクションを作成
+        for spec in self._ACTION_SPECS:
+            toolbar.addAction(self._create_spec_action(spec))
         
         # ツールバーの参照を保存
         self.toolbar = toolbar
+        self._update_toolbar_separators()
+
+    def _default_action_order(self) -> list[str]:
+        """ツールバーの既定のアクション順（objectName）を取得"""
+        return ["undo_action", "redo_action"] + [spec[1] for spec in self._ACTION_SPECS]
+
+    def _create_spec_action(self, spec) -> QAction:
+        """アクション定義からアクションを作成"""
+        text, object_name, shortcut, slot_name, status_tip, checked = spec
+        action = QAction(text, self)
+        action.setObjectName(object_name)
+        action.setStatusTip(status_tip)
+        if shortcut is not None:
+            action.setShortcuts(self._key_sequences(shortcut))
+            action.setShortcutContext(Qt.WindowShortcut)
+        if checked is not None:
+            action.setCheckable(True)
+            action.setChecked(checked)
+        self._bind_action_slot(action, slot_name)
+        return action
+
+    @classmethod
+    def _key_sequences(cls, shortcut) -> list[QKeySequence]:
+        """ショートカット定義に対応するQKeySequenceの一覧を取得（初回のみ生成してキャッシュ）"""
+        sequences = cls._key_sequence_cache.get(shortcut)
+        if sequences is None:
+            keys = shortcut if isinstance(shortcut, tuple) else (shortcut,)
+            sequences = [QKeySequence(key) for key in keys]
+            cls._key_sequence_cache[shortcut] = sequences
+        return sequences
+
+    def _bind_action_slot(self, action: QAction, slot_name: str):
+        """スロット名に対応するメソッドをアクションに接続"""
+        slot = attrgetter(slot_name)(self)
+        if action.isCheckable():
+            action.toggled.connect(slot)
+        else:
+            action.triggered.connect(slot)
 
     def _save_toolbar_state(self):
+        """ツールバーの状態の保存を予約（連続した呼び出しは1回の保存にまとめる）"""
+        self._save_timer.start()
+
+    def _do_save_toolbar_state(self):
         """ツールバーの状態を保存（アクション順番のみ）"""
         try:
-            settings = QSettings("MindMapApp", "ToolbarSettings")
-            
             # アクションの順番を保存
             action_order = []
             for action in self.toolbar.actions():
                 if action.objectName():
                     action_order.append(action.objectName())
             
-            settings.setValue("action_order", action_order)
+            self._settings.setValue(KEY_ACTION_ORDER, action_order)
+            self._settings.sync()
+            self._toolbar_dirty = False
             
-        except Exception as e:
-            print(f"ツールバー状態の保存エラー: {e}")
+        except Exception:
+            log.exception("ツールバー状態の保存エラー")
 
     def _restore_toolbar_state(self):
         """ツールバーの状態を復元"""
         try:
-            settings = QSettings("MindMapApp", "ToolbarSettings")
-            
             # アクションの順番を復元
-            action_order = settings.value("action_order", [])
+            action_order = self._settings.value(KEY_ACTION_ORDER, [])
             if action_order:
                 self._reorder_toolbar_actions(action_order)
             
             # ジオメトリと位置を復元
-            toolbar_geometry = settings.value("toolbar_geometry")
+            toolbar_geometry = self._settings.value(KEY_TOOLBAR_GEOMETRY)
             if toolbar_geometry:
                 self.toolbar.restoreGeometry(toolbar_geometry)
             
             # 浮動状態を復元
-            is_floating = settings.value("toolbar_floating", False, type=bool)
+            is_floating = self._settings.value(KEY_TOOLBAR_FLOATING, False, type=bool)
             if is_floating:
                 self.toolbar.setFloating(True)
             
             # ツールバーエリアを復元（安全に）
             try:
-                toolbar_area = settings.value("toolbar_area", Qt.TopToolBarArea, type=int)
+                toolbar_area = self._settings.value(KEY_TOOLBAR_AREA, Qt.TopToolBarArea, type=int)
                 if toolbar_area in [Qt.TopToolBarArea, Qt.BottomToolBarArea, Qt.LeftToolBarArea, Qt.RightToolBarArea]:
                     # 既存のツールバーを削除してから新しいエリアに追加
                     self.removeToolBar(self.toolbar)
                     self.addToolBar(Qt.ToolBarArea(toolbar_area), self.toolbar)
-            except Exception as area_error:
-                print(f"ツールバーエリア復元エラー: {area_error}")
+            except Exception:
+                log.exception("ツールバーエリア復元エラー")
                 # エラーの場合はデフォルトの上部エリアに配置
                 pass
             
-        except Exception as e:
-            print(f"ツールバー状態の復元エラー: {e}")
+        except Exception:
+            log.exception("ツールバー状態の復元エラー")
 
     def _restore_toolbar_actions_only(self):
         """ツールバーのアクション順番のみを復元（安全版）"""
         try:
-            settings = QSettings("MindMapApp", "ToolbarSettings")
-            action_order = settings.value("action_order", [])
+            action_order = self._settings.value(KEY_ACTION_ORDER, [])
             if action_order:
                 self._reorder_toolbar_actions(action_order)
-        except Exception as e:
-            print(f"ツールバーアクション復元エラー: {e}")
+        except Exception:
+            log.exception("ツールバーアクション復元エラー")
 
     def _reorder_toolbar_actions(self, action_order):
-        """ツールバーのアクションを指定された順番に並べ替え"""
+        """ツールバーのアクションを指定された順番に並べ替え（既存のアクションを移動するだけで再作成しない）"""
         try:
-            # 現在のアクションを取得
-            current_actions = self.toolbar.actions()
-            
             # アクションを名前でマッピング
             action_map = {}
-            for action in current_actions:
+            for action in self.toolbar.actions():
                 if action.objectName():
                     action_map[action.objectName()] = action
             
-            # 新しい順番でアクションを再作成
-            new_actions = []
+            # 既に指定どおりの順番なら何もしない（起動時に保存順が既定順と同じ場合など）
+            if list(action_order) == list(action_map):
+                return
+            
+            # 指定された順番で末尾に付け直す
             for action_name in action_order:
-                if action_name in action_map:
-                    action = action_map[action_name]
-                    # アクションの情報を保存
-                    new_actions.append({
-                        'text': action.text(),
-                        'object_name': action.objectName(),
-                        'checkable': action.isCheckable(),
-                        'checked': action.isChecked(),
-                        'shortcut': action.shortcut(),
-                        'status_tip': action.statusTip()
-                    })
-            
-            # 順番に含まれていないアクションも追加
-            for action in current_actions:
-                if action.objectName() and action.objectName() not in action_order:
-                    new_actions.append({
-                        'text': action.text(),
-                        'object_name': action.objectName(),
-                        'checkable': action.isCheckable(),
-                        'checked': action.isChecked(),
-                        'shortcut': action.shortcut(),
-                        'status_tip': action.statusTip()
-                    })
-            
-            # ツールバーを完全に再作成
-            self.removeToolBar(self.toolbar)
-            self._create_toolbar_with_order(new_actions)
-                    
-        except Exception as e:
-            print(f"ツールバーアクション並べ替えエラー: {e}")
-
-    def _create_toolbar_with_order(self, action_data_list):
-        """指定された順番でツールバーを作成"""
-        try:
-            # 新しいツールバーを作成
-            toolbar = QToolBar("Tools", self)
-            
-            # ツールバーのドラッグ&ドロップ機能を有効にする
-            toolbar.setMovable(True)
-            toolbar.setFloatable(True)
-            toolbar.setAllowedAreas(Qt.TopToolBarArea | Qt.BottomToolBarArea | Qt.LeftToolBarArea | Qt.RightToolBarArea)
-            toolbar.setContextMenuPolicy(Qt.CustomContextMenu)
-            toolbar.customContextMenuRequested.connect(self._show_toolbar_context_menu)
-            
-            self.addToolBar(toolbar)
-            
-            # アクションを順番に追加
-            for action_data in action_data_list:
-                if 'separator' in action_data and action_data['separator']:
-                    # セパレーターを追加
-                    toolbar.addSeparator()
-                else:
-                    # 通常のアクションを追加
-                    action = QAction(action_data['text'], self)
-                    action.setObjectName(action_data['object_name'])
-                    action.setCheckable(action_data['checkable'])
-                    action.setChecked(action_data['checked'])
-                    action.setShortcut(action_data['shortcut'])
-                    action.setStatusTip(action_data['status_tip'])
-                    
-                    # アクションの接続を復元
-                    self._connect_action(action)
-                    
-                    toolbar.addAction(action)
+                action = action_map.pop(action_name, None)
+                if action:
+                    self.toolbar.removeAction(action)
+                    self.toolbar.addAction(action)
             
-            # ツールバーの参照を更新
-            self.toolbar = toolbar
+            # 順番に含まれていないアクションはその後ろに並べる
+            for action in action_map.values():
+                self.toolbar.removeAction(action)
+                self.toolbar.addAction(action)
             
-        except Exception as e:
-            print(f"ツールバー作成エラー: {e}")
-
-    def _connect_action(self, action):
-        """アクションの接続を復元"""
-        try:
-            object_name = action.objectName()
-            
-            if object_name == "undo_action":
-                action.triggered.connect(self.undo_stack.undo)
-            elif object_name == "redo_action":
-                action.triggered.connect(self.undo_stack.redo)
-            elif object_name == "add_node_action":
-                action.triggered.connect(self._add_node)
-            elif object_name == "select_all_action":
-                action.triggered.connect(self.view._select_all_nodes)
-            elif object_name == "connect_mode_action":
-                action.toggled.connect(self._toggle_connect_mode)
-            elif object_name == "fit_action":
-                action.triggered.connect(self.view.fit_all_nodes)
-            elif object_name == "auto_fit_action":
-                action.toggled.connect(self._toggle_auto_fit)
-            elif object_name == "attraction_action":
-                action.toggled.connect(self._toggle_attraction)
-            elif object_name == "zoom_speed_action":
-                action.triggered.connect(self._show_zoom_speed_dialog)
-            elif object_name == "transparency_action":
-                action.triggered.connect(self._show_transparency_dialog)
-            elif object_name == "appearance_action":
-                action.triggered.connect(self._show_appearance_menu)
-            elif object_name == "grid_action":
-                action.toggled.connect(self._toggle_grid)
-            elif object_name == "grid_snap_action":
-                action.toggled.connect(self._toggle_grid_snap)
-            elif object_name == "align_action":
-                action.triggered.connect(self.view.align_generations_and_avoid_line_overlap)
-            elif object_name == "delete_action":
-                action.triggered.connect(self._delete_selected_nodes)
-            elif object_name == "save_action":
-                action.triggered.connect(self._save_mindmap)
-            elif object_name == "load_action":
-                action.triggered.connect(self._load_mindmap)
-                
-        except Exception as e:
-            print(f"アクション接続エラー: {e}")
+            self._update_toolbar_separators()
+                    
+        except Exception:
+            log.exception("ツールバーアクション並べ替えエラー")
+
+    def _update_toolbar_separators(self):
+        """ボタングループの境界にのみセパレーターを配置"""
+        # 既存のセパレーターを取り除く
+        for action in self.toolbar.actions():
+            if action.isSeparator():
+                self.toolbar.removeAction(action)
+                action.deleteLater()
+        
+        # 隣り合うアクションのグループが異なる位置にセパレーターを挿入
+        previous_group = None
+        for action in self.toolbar.actions():
+            group = _TOOLBAR_GROUP_OF.get(action.objectName())
+            if previous_group is not None and group != previous_group:
+                self.toolbar.insertSeparator(action)
+            previous_group = group
 
     def _show_toolbar_context_menu(self, position):
         """ツールバーの右クリックメニューを表示"""
         try:
-            from PySide6.QtWidgets import QMenu
-            
             menu = QMenu(self)
             
             # ツールバーリセット
@@ -505,30 +533,31 @@ class MainWindow(QMainWindow):
             # メニューを表示
             menu.exec(self.toolbar.mapToGlobal(position))
             
-        except Exception as e:
-            print(f"ツールバーコンテキストメニューエラー: {e}")
+        except Exception:
+            log.exception("ツールバーコンテキストメニューエラー")
 
     def _reset_toolbar(self):
         """ツールバーをデフォルト状態にリセット"""
         try:
-            # 設定をクリア
-            settings = QSettings("MindMapApp", "ToolbarSettings")
-            settings.clear()
+            # ツールバーの設定のみクリア
+            for key in TOOLBAR_SETTING_KEYS:
+                self._settings.remove(key)
             
-            # ツールバーを完全に再作成
-            self.removeToolBar(self.toolbar)
-            self._create_toolbar()
+            # 既存のアクションを既定の順番に並べ直し、上部に戻す
+            # （アクションを作り直さないので接続やショートカットの再登録は不要）
+            self._reorder_toolbar_actions(self._default_action_order())
+            self.addToolBar(Qt.TopToolBarArea, self.toolbar)
+            self.toolbar.show()
+            self._toolbar_dirty = True
             
-            print("ツールバーをリセットしました")
+            log.debug("ツールバーをリセットしました")
             
-        except Exception as e:
-            print(f"ツールバーリセットエラー: {e}")
+        except Exception:
+            log.exception("ツールバーリセットエラー")
 
     def _show_reorder_dialog(self):
         """ボタン順番変更ダイアログを表示"""
         try:
-            from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QLabel
-            
             dialog = QDialog(self)
             dialog.setWindowTitle("ツールバーボタンの順番変更")
             dialog.setModal(True)
@@ -544,17 +573,15 @@ class MainWindow(QMainWindow):
             list_widget = QListWidget()
             current_actions = self.toolbar.actions()
             
-            print(f"ツールバー内のアクション数: {len(current_actions)}")
-            
             for i, action in enumerate(current_actions):
-                print(f"アクション {i}: text='{action.text()}', objectName='{action.objectName()}', isSeparator={action.isSeparator()}")
-                
                 # セパレーターでないアクションのみを表示
                 if not action.isSeparator():
                     display_text = action.text() if action.text() else f"アクション {i}"
-                    list_widget.addItem(display_text)
+                    # 並べ替え結果は表示名ではなくobjectNameで受け取る
+                    item = QListWidgetItem(display_text)
+                    item.setData(Qt.UserRole, action.objectName())
+                    list_widget.addItem(item)
             
-            print(f"リストに追加されたアイテム数: {list_widget.count()}")
             layout.addWidget(list_widget)
             
             # ボタンレイアウト
@@ -582,8 +609,8 @@ class MainWindow(QMainWindow):
             
             dialog.exec()
             
-        except Exception as e:
-            print(f"順番変更ダイアログエラー: {e}")
+        except Exception:
+            log.exception("順番変更ダイアログエラー")
 
     def _move_item_up(self, list_widget):
         """リストアイテムを上に移動"""
@@ -604,78 +631,25 @@ class MainWindow(QMainWindow):
     def _apply_reorder(self, list_widget, dialog):
         """新しい順番を適用"""
         try:
-            # 現在のアクションを取得
-            current_actions = self.toolbar.actions()
-            
-            # 新しい順番を取得
-            new_order = []
+            # 新しい順番（objectName）を取得
+            new_action_order = []
             for i in range(list_widget.count()):
-                new_order.append(list_widget.item(i).text())
-            
-            print(f"新しい順番: {new_order}")
-            
-            # アクション名のマッピング（テキストからobjectNameへ）
-            action_name_map = {
-                "取り消し": "undo_action",
-                "やり直し": "redo_action", 
-                "ノード追加": "add_node_action",
-                "全選択": "select_all_action",
-                "接続モード": "connect_mode_action",
-                "フィット": "fit_action",
-                "オートフィット": "auto_fit_action",
-                "アトラクション": "attraction_action",
-                "ズーム速度": "zoom_speed_action",
-                "透明度": "transparency_action",
-                "アピアランス": "appearance_action",
-                "グリッド": "grid_action",
-                "グリッドスナップ": "grid_snap_action",
-                "整理": "align_action",
-                "削除": "delete_action",
-                "保存": "save_action",
-                "読み込み": "load_action"
-            }
-            
-            # 現在のアクションをテキストでマッピング
-            current_action_map = {}
-            for action in current_actions:
-                if not action.isSeparator() and action.text():
-                    current_action_map[action.text()] = action
-            
-            # 新しい順番でアクションを再作成
-            new_actions = []
-            for text in new_order:
-                if text in current_action_map:
-                    action = current_action_map[text]
-                    # アクションの情報を保存
-                    new_actions.append({
-                        'text': action.text(),
-                        'object_name': action.objectName(),
-                        'checkable': action.isCheckable(),
-                        'checked': action.isChecked(),
-                        'shortcut': action.shortcut(),
-                        'status_tip': action.statusTip()
-                    })
-            
-            # セパレーターを適切な位置に挿入
-            new_actions_with_separators = []
-            for i, action_data in enumerate(new_actions):
-                new_actions_with_separators.append(action_data)
-                # 特定の位置にセパレーターを挿入
-                if i in [1, 3, 5, 7, 9, 11, 13]:  # 適切な位置にセパレーターを挿入
-                    new_actions_with_separators.append({'separator': True})
-            
-            # ツールバーを完全に再作成
-            self.removeToolBar(self.toolbar)
-            self._create_toolbar_with_order(new_actions_with_separators)
+                new_action_order.append(list_widget.item(i).data(Qt.UserRole))
+            
+            log.debug("新しい順番: %s", new_action_order)
+            
+            # 既存のアクションを並べ替え（セパレーターはグループ定義から再配置される）
+            self._reorder_toolbar_actions(new_action_order)
             
             # 設定を保存
+            self._toolbar_dirty = True
             self._save_toolbar_state()
             
             dialog.accept()
-            print("ツールバーの順番を変更しました")
+            log.debug("ツールバーの順番を変更しました")
             
-        except Exception as e:
-            print(f"順番適用エラー: {e}")
+        except Exception:
+            log.exception("順番適用エラー")
 
     def _create_toolbar_actions(self):
         """ツールバーのアクションを作成（リセット用）"""
@@ -685,21 +659,20 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """アプリケーション終了時の処理"""
-        # ツールバーの状態を保存
-        self._save_toolbar_state()
+        # 未保存の変更がある場合のみ、予約中の保存を待たずにその場で書き込む
+        self._save_timer.stop()
+        if self._toolbar_dirty:
+            self._do_save_toolbar_state()
         event.accept()
 
     def _add_node(self):
         """ノードを追加"""
-        from commands import AddNodeCommand
-        
         parent_node = None
         new_pos = None
         is_parent_node = False
         
         # 選択されたノードがあれば親ノードとして使用
-        from node import NodeItem
-        selected = [it for it in self.view.scene.selectedItems() if isinstance(it, NodeItem)]
+        selected = self.view.get_selected_nodes()
         if selected:
             parent_node = selected[0]
             new_pos = self.view._calculate_smart_position(parent_node)
@@ -721,26 +694,49 @@ class MainWindow(QMainWindow):
 
     def _show_zoom_speed_dialog(self):
         """ズーム速度設定ダイアログを表示"""
-        dialog = ZoomSpeedDialog(self, self.view.get_zoom_speed())
+        # ダイアログは初回のみ作成し、以降は現在値を反映して再利用
+        if self._zoom_dialog is None:
+            self._zoom_dialog = ZoomSpeedDialog(self, self.view.get_zoom_speed())
+        else:
+            self._zoom_dialog.set_zoom_speed(self.view.get_zoom_speed())
+        dialog = self._zoom_dialog
         if dialog.exec() == QDialog.Accepted:
             new_speed = dialog.get_zoom_speed()
             self.view.set_zoom_speed(new_speed)
 
     def _show_transparency_dialog(self):
         """透明度設定ダイアログを表示"""
-        dialog = TransparencyDialog(
-            self,
+        # 表示中に再度呼ばれた場合はモーダルダイアログを重ねない
+        if self._transparency_dialog_open:
+            return
+        self._transparency_dialog_open = True
+        try:
+            self._run_transparency_dialog()
+        finally:
+            self._transparency_dialog_open = False
+
+    def _run_transparency_dialog(self):
+        """透明度設定ダイアログを実行し、OK時に設定を反映"""
+        transparencies = (
             self.view.get_background_transparency(),
             self.view.get_node_transparency(),
             self.view.get_line_transparency(),
             self.view.get_window_transparency()
         )
+        # ダイアログは初回のみ作成し、以降は現在値を反映して再利用
+        if self._transparency_dialog is None:
+            self._transparency_dialog = TransparencyDialog(self, *transparencies)
+        else:
+            self._transparency_dialog.set_transparencies(*transparencies)
+        dialog = self._transparency_dialog
         if dialog.exec() == QDialog.Accepted:
-            self.view.set_background_transparency(dialog.get_background_transparency())
-            self.view.set_node_transparency(dialog.get_node_transparency())
-            self.view.set_line_transparency(dialog.get_line_transparency())
-            # ウィンドウ全体の透明度も設定
-            self.view.set_window_transparency(dialog.get_window_transparency())
+            # 4種類の透明度をまとめて適用（再描画は1回）
+            self.view.apply_transparency(
+                dialog.get_background_transparency(),
+                dialog.get_node_transparency(),
+                dialog.get_line_transparency(),
+                dialog.get_window_transparency()
+            )
 
     def _toggle_grid(self, enabled: bool):
         """グリッドの切り替え"""
@@ -781,9 +777,9 @@ class MainWindow(QMainWindow):
         )
         if file_path:
             try:
-                json_data = self.view._export_to_json()
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(json_data)
+                # エンコード済みの文字列を大きめのバッファで一度に書き込む
+                with open(file_path, 'w', encoding='utf-8', buffering=SAVE_BUFFER_SIZE) as f:
+                    self.view._export_to_json(f)
                 self.statusBar().showMessage(f"保存しました: {file_path}", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"保存に失敗しました: {e}")
@@ -796,87 +792,143 @@ class MainWindow(QMainWindow):
             "",
             "JSON Files (*.json);;All Files (*)"
         )
-        if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    json_data = f.read()
-                self.view._import_from_json(json_data)
-                self.statusBar().showMessage(f"読み込みました: {file_path}", 3000)
-            except Exception as e:
-                QMessageBox.critical(self, "エラー", f"読み込みに失敗しました: {e}")
-
-    def _show_appearance_menu(self):
-        """アピアランスメニューを表示"""
-        from PySide6.QtWidgets import QMenu
-        
-        menu = QMenu(self)
+        if file_path and self._loader is None:
+            # ファイル読み込みはワーカースレッドで行い、シーンの再構築のみメインスレッドで行う
+            self._loader = _MindMapLoader(file_path)
+            self._loader.signals.finished.connect(self._on_load_finished)
+            self._loader.signals.failed.connect(self._on_load_failed)
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            self.statusBar().showMessage(f"読み込み中...: {file_path}")
+            QThreadPool.globalInstance().start(self._loader)
+
+    def _on_load_finished(self, file_path: str, data: dict):
+        """読み込み完了時の処理"""
+        self._finish_loading()
+        try:
+            self.view._import_from_dict(data)
+            self.statusBar().showMessage(f"読み込みました: {file_path}", 3000)
+        except Exception as e:
+            QMessageBox.critical(self, "エラー", f"読み込みに失敗しました: {e}")
+
+    def _on_load_failed(self, file_path: str, message: str):
+        """読み込み失敗時の処理"""
+        self._finish_loading()
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "エラー", f"読み込みに失敗しました: {message}")
+
+    def _finish_loading(self):
+        """読み込み中の表示を解除"""
+        self._loader = None
+        QApplication.restoreOverrideCursor()
+
+    def _build_theme_menu(self):
+        """テーマ選択メニューを作成（1回だけ作成して使い回す）"""
+        self._theme_menu = QMenu(self)
+        self._theme_actions: dict[str, QAction] = {}
         
-        # 各テーマのアクションを作成
-        for theme_id, theme_data in self.themes.items():
-            action = QAction(theme_data["name"], self)
+        # 各テーマのアクションを排他グループにまとめ、選択は1つの接続で受け取る
+        group = QActionGroup(self._theme_menu)
+        group.setExclusive(True)
+        for theme_id, theme_data in self.THEMES.items():
+            action = QAction(theme_data["name"], group)
             action.setCheckable(True)
+            action.setData(theme_id)
             action.setChecked(theme_id == self.current_theme)
-            action.triggered.connect(lambda checked, tid=theme_id: self._change_theme(tid))
-            menu.addAction(action)
+            self._theme_menu.addAction(action)
+            self._theme_actions[theme_id] = action
+        group.triggered.connect(self._on_theme_action_triggered)
+
+    def _show_appearance_menu(self):
+        """アピアランスメニューを表示"""
+        # 初回表示時のみメニューを作成（以降は使い回す）
+        if self._theme_menu is None:
+            self._build_theme_menu()
         
         # メニューを表示（マウスカーソル位置に表示）
-        menu.exec(self.cursor().pos())
+        self._theme_menu.exec(QCursor.pos())
+
+    def _on_theme_action_triggered(self, action: QAction):
+        """テーマメニューで選択されたテーマに変更"""
+        self._change_theme(action.data())
+
+    @classmethod
+    def _theme_stylesheet(cls, theme_id: str) -> str:
+        """テーマのツールバー用スタイルシートを取得（初回のみ組み立ててキャッシュ）"""
+        stylesheet = cls._stylesheet_cache.get(theme_id)
+        if stylesheet is None:
+            stylesheet = cls._build_stylesheet(cls.THEMES[theme_id])
+            cls._stylesheet_cache[theme_id] = stylesheet
+        return stylesheet
+
+    @staticmethod
+    def _build_stylesheet(theme: dict) -> str:
+        """テーマの配色でテンプレートを置換してツールバー用スタイルシートを組み立てる"""
+        return _TOOLBAR_QSS_TEMPLATE.substitute(theme, toolbar_name=MAIN_TOOLBAR_NAME)
+
+    def _apply_theme_palette(self, theme: dict):
+        """テーマの背景色・文字色をパレットでウィンドウとステータスバーに設定"""
+        palette = QPalette(QApplication.palette())
+        palette.setColor(QPalette.ColorRole.Window, QColor(theme["background"]))
+        palette.setColor(QPalette.ColorRole.WindowText, QColor(theme["text_color"]))
+        palette.setColor(QPalette.ColorRole.Button, QColor(theme["button_bg"]))
+        palette.setColor(QPalette.ColorRole.ButtonText, QColor(theme["text_color"]))
+        self.setPalette(palette)
+        
+        # ステータスバーはツールバーと同じ背景色
+        status_palette = QPalette(palette)
+        status_palette.setColor(QPalette.ColorRole.Window, QColor(theme["toolbar_bg"]))
+        status_bar = self.statusBar()
+        status_bar.setAutoFillBackground(True)
+        status_bar.setPalette(status_palette)
 
     def _change_theme(self, theme_id: str):
         """テーマを変更"""
-        if theme_id not in self.themes:
+        if theme_id not in self.THEMES:
+            return
+        # 同じテーマが再選択された場合はスタイルシートもビューも更新しない
+        if theme_id == self.current_theme:
             return
         
         self.current_theme = theme_id
-        theme = self.themes[theme_id]
-        
-        # スタイルシートを適用
-        stylesheet = f"""
-        QMainWindow {{
-            background-color: {theme['background']};
-        }}
-        QToolBar {{
-            background-color: {theme['toolbar_bg']};
-            border: none;
-            spacing: 3px;
-        }}
-        QToolButton {{
-            background-color: {theme['button_bg']};
-            border: 1px solid {theme['node_border']};
-            border-radius: 4px;
-            padding: 4px 8px;
-            color: {theme['text_color']};
-        }}
-        QToolButton:hover {{
-            background-color: {theme['button_hover']};
-        }}
-        QToolButton:checked {{
-            background-color: {theme['button_checked']};
-            color: {theme['button_checked_text']};
-            border: 2px solid {theme['button_checked']};
-        }}
-        QStatusBar {{
-            background-color: {theme['toolbar_bg']};
-            color: {theme['text_color']};
-        }}
-        """
+        theme = self.THEMES[theme_id]
+        # メニュー作成済みなら選択中のテーマにチェック（排他グループが前のチェックを外す）
+        if self._theme_menu is not None:
+            self._theme_actions[theme_id].setChecked(True)
         
-        self.setStyleSheet(stylesheet)
-        
-        # ビューにもテーマ情報を渡す
-        self.view.set_theme(theme)
+        # パレット・スタイルシート・ビューの更新中は再描画を止め、最後に1回だけ描画する
+        self.setUpdatesEnabled(False)
+        try:
+            # 単純な配色はパレットで適用し、スタイルシートはツールバーの枠線・状態表示のみに絞る
+            self._apply_theme_palette(theme)
+            # ツールバーのスタイルシートはテーマごとに1回だけ組み立ててキャッシュ
+            toolbar_stylesheet = self._theme_stylesheet(theme_id)
+            self._toolbar_stylesheet = toolbar_stylesheet
+            self.toolbar.setStyleSheet(toolbar_stylesheet)
+            
+            # ビューには前回から変わった配色のみを渡す（同じ配色のノードを再設定しない）
+            last_theme = self._last_theme_applied_to_view
+            changed = {key: value for key, value in theme.items() if last_theme.get(key) != value}
+            if changed:
+                self.view.set_theme(changed)
+            self._last_theme_applied_to_view = dict(theme)
+        finally:
+            self.setUpdatesEnabled(True)
         
         self.statusBar().showMessage(f"テーマを「{theme['name']}」に変更しました", 2000)
 
 
 def main():
     """メイン関数"""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    # ホイール・マウス移動などの高頻度イベントをまとめて処理（アプリ生成前に設定）
+    QApplication.setAttribute(Qt.AA_CompressHighFrequencyEvents)
+    QApplication.setAttribute(Qt.AA_CompressTabletEvents)
     app = QApplication(sys.argv)
     
     window = MainWindow()
     window.show()
     
-    sys.exit(app.exec())
+    raise SystemExit(app.exec())
 
 
 if __name__ == "__main__":
@@ -30,19 +30,16 @@ class MainWindow(QMainWindow):
         self.view = MindMapView(self)
         self.setCentralWidget(self.view)
         
-        # macOS用の背景透明化設定
-        self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self.setAttribute(Qt.WA_NoSystemBackground, True)
-        
-        # ウィンドウのスタイルシートも設定
+        # ウィンドウは不透明な単色で描画し、全体のフェードは setWindowOpacity で行う
         self.setStyleSheet("""
             QMainWindow { 
-                background: transparent; 
+                background: #f0f0f0; 
             }
             QToolBar {
-                background: rgba(240, 240, 240, 200);
+                background: #f0f0f0;
             }
         """)
+        self.setWindowOpacity(self.transparency)
         
         # ビューにフォーカスを設定
         self.view.setFocusPolicy(Qt.StrongFocus)
@@ -154,13 +151,14 @@ class MainWindow(QMainWindow):
     def _add_node(self):
         """ノードを追加"""
         from commands import AddNodeCommand
+        from node import NodeItem
         
         parent_node = None
         new_pos = None
         is_parent_node = False
         
         # 選択されたノードがあれば親ノードとして使用
-        selected = [it for it in self.view.scene.selectedItems() if isinstance(it, 'NodeItem')]
+        selected = [it for it in self.view.scene.selectedItems() if isinstance(it, NodeItem)]
         if selected:
             parent_node = selected[0]
             new_pos = self.view._calculate_smart_position(parent_node)
@@ -221,9 +219,8 @@ class MainWindow(QMainWindow):
         )
         if file_path:
             try:
-                json_data = self.view._export_to_json()
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(json_data)
+                    self.view._export_to_json(f)
                 self.statusBar().showMessage(f"保存しました: {file_path}", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"保存に失敗しました: {e}")
@@ -239,8 +236,7 @@ class MainWindow(QMainWindow):
         if file_path:
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    json_data = f.read()
-                self.view._import_from_json(json_data)
+                    self.view._import_from_json(f)
                 self.statusBar().showMessage(f"読み込みました: {file_path}", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"読み込みに失敗しました: {e}")
@@ -253,7 +249,7 @@ def main():
     window = MainWindow()
     window.show()
     
-    sys.exit(app.exec())
+    raise SystemExit(app.exec())
 
 
 if __name__ == "__main__":
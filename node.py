@@ -1,8 +1,8 @@
 """
 ノード関連のクラス
 """
-from PySide6.QtCore import QPointF, Qt, QRectF, QPropertyAnimation, QEasingCurve
-from PySide6.QtGui import QPen, QColor, QPainter, QBrush, QLinearGradient
+from PySide6.QtCore import QPointF, Qt, QRectF, QPropertyAnimation, QEasingCurve, QTimer
+from PySide6.QtGui import QPen, QColor, QPainter, QBrush, QLinearGradient, QFont, QTextDocument
 from PySide6.QtWidgets import (
     QGraphicsRectItem,
     QGraphicsTextItem,
@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
 )
 
 import math
+from functools import lru_cache
 
 # 循環インポートを避けるため、型チェック時のみインポート
 from typing import TYPE_CHECKING
@@ -17,6 +18,51 @@ if TYPE_CHECKING:
     from view import MindMapView
     from connection import CrankConnection
 
+# 選択状態ごとの枠線（全ノードで共有し、ノードごとに生成しない）
+_NODE_PEN_SELECTED = QPen(Qt.gray, 1.6)
+_NODE_PEN_DEFAULT = QPen(QColor(200, 200, 200), 1.5)
+
+
+@lru_cache(maxsize=None)
+def _theme_pen(color: str) -> QPen:
+    """テーマの枠線色のペンを取得（色ごとに1つだけ生成して共有）"""
+    pen = QPen(QColor(color))
+    pen.setWidth(2)
+    return pen
+
+
+@lru_cache(maxsize=None)
+def _theme_brush(color: str) -> QBrush:
+    """テーマの背景色のブラシを取得（色ごとに1つだけ生成して共有）"""
+    return QBrush(QColor(color))
+
+
+# テキストサイズのキャッシュ上限（件数）
+TEXT_SIZE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TEXT_SIZE_CACHE_SIZE)
+def _text_size(text: str, font_spec: str) -> tuple[float, float]:
+    """テキストとフォント（QFont.toString()）の組み合わせごとの幅と高さを取得"""
+    # QGraphicsTextItemと同じくQTextDocumentでレイアウトして大きさを求める
+    font = QFont()
+    font.fromString(font_spec)
+    document = QTextDocument()
+    document.setDefaultFont(font)
+    document.setPlainText(text)
+    size = document.size()
+    return (size.width(), size.height())
+
+# itemChange で処理する変更の種類
+_HANDLED_CHANGES = frozenset((
+    QGraphicsItem.ItemPositionChange,
+    QGraphicsItem.ItemPositionHasChanged,
+    QGraphicsItem.ItemSelectedHasChanged,
+))
+
+# 接続線を更新する最小の移動量（画面上のpx、これ未満の移動では線を再計算しない）
+EDGE_UPDATE_MIN_DELTA = 0.5
+
 
 class NodeItem(QGraphicsRectItem):
     """
@@ -43,6 +89,12 @@ class NodeItem(QGraphicsRectItem):
         self._view = view
         self._edges: list[tuple['CrankConnection', 'NodeItem']] = []
         self._press_pos: QPointF | None = None
+        # 接続線の更新が次のイベントループ処理に予約済みか（ドラッグ中の更新をまとめる）
+        self._edges_dirty = False
+        # 最後に接続線を更新したときのノード位置
+        self._last_edge_update_pos: QPointF | None = None
+        # シーン上の境界矩形のキャッシュ（位置・ペン・テキスト変更時に無効化）
+        self._cached_scene_br: QRectF | None = None
         # 接続線の縦線重なり回避用のオフセット
         self.vertical_line_offset: float = 0.0
         
@@ -60,6 +112,11 @@ class NodeItem(QGraphicsRectItem):
         self.text_item.setDefaultTextColor(Qt.black)
         self._update_text_position()
         
+        # 描画結果をデバイス座標のピクスマップにキャッシュ（パン・再描画時にラスタライズし直さない）
+        # ペン・ブラシ・テキストの変更時はQtが自動的にキャッシュを無効化する
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.text_item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        
         # 選択状態のスタイル
         self._update_selection_style()
         
@@ -75,28 +132,90 @@ class NodeItem(QGraphicsRectItem):
     
     def _update_attached_lines(self) -> None:
         """接続された線を更新"""
+        self.mark_edges_updated()
         for connection, _ in self._edges:
             connection.update_connection()
     
+    def mark_edges_updated(self) -> None:
+        """接続線を現在位置で更新したことを記録（ビューやコマンドが線をまとめて更新した場合も呼ぶ）"""
+        self._last_edge_update_pos = self.pos()
+    
+    def _moved_since_edge_update(self, pos: QPointF) -> bool:
+        """前回接続線を更新した位置から画面上で見える距離だけ移動したか"""
+        last = self._last_edge_update_pos
+        if last is None:
+            return True
+        threshold = EDGE_UPDATE_MIN_DELTA / max(self._view.transform().m11(), 1e-6)
+        return abs(pos.x() - last.x()) + abs(pos.y() - last.y()) >= threshold
+    
+    def _schedule_edge_update(self) -> None:
+        """接続線の更新を次のイベントループ処理に予約（同じ周回内の移動は1回の更新にまとめる）"""
+        if self._edges_dirty or not self._edges:
+            return
+        # 複数ノード移動中はビューにまとめて更新させる（両端が移動した線を2回更新しない）
+        if self._view._is_multi_move_in_progress:
+            self._view._queue_edge_updates(self)
+            return
+        self._edges_dirty = True
+        QTimer.singleShot(0, self._flush_edge_updates)
+    
+    def _flush_edge_updates(self) -> None:
+        """予約された接続線の更新を実行"""
+        if not self._edges_dirty:
+            return
+        self._edges_dirty = False
+        try:
+            if self.scene() is None:
+                return
+        except RuntimeError:
+            # 予約後にシーンごと削除された場合
+            return
+        self._update_attached_lines()
+    
+    def cached_scene_rect(self) -> QRectF:
+        """シーン上の境界矩形を取得（変更されるまでキャッシュを再利用）"""
+        if self._cached_scene_br is None:
+            self._cached_scene_br = self.sceneBoundingRect()
+        return self._cached_scene_br
+    
+    def _invalidate_scene_rect(self) -> None:
+        """境界矩形のキャッシュを無効化"""
+        self._cached_scene_br = None
+    
+    def setPen(self, pen):
+        """ペンを設定（線幅で境界矩形が変わるためキャッシュを無効化）"""
+        super().setPen(pen)
+        self._invalidate_scene_rect()
+    
     def _update_selection_style(self):
         """選択状態に応じて枠線のスタイルを更新"""
-        if self.isSelected():
-            self.setPen(QPen(Qt.gray, 1.6))
-        else:
-            self.setPen(QPen(QColor(200, 200, 200), 1.5))
+        self.setPen(_NODE_PEN_SELECTED if self.isSelected() else _NODE_PEN_DEFAULT)
+    
+    def text_size(self) -> tuple[float, float]:
+        """テキストの幅と高さを取得（同じテキストとフォントの組み合わせはキャッシュを再利用）"""
+        return _text_size(self.text_item.toPlainText(), self.text_item.font().toString())
     
     def _update_text_position(self):
         """テキストの位置を更新"""
-        text_rect = self.text_item.boundingRect()
-        self.text_item.setPos(-text_rect.width() / 2.0, -text_rect.height() / 2.0)
+        text_width, text_height = self.text_size()
+        self.text_item.setPos(-text_width / 2.0, -text_height / 2.0)
+        self._invalidate_scene_rect()
     
     def itemChange(self, change: 'QGraphicsItem.GraphicsItemChange', value):
         """アイテムの変更を処理"""
+        # 処理対象外の変更（フラグ・シーン・親の変更など）はそのまま基底クラスに任せる
+        if change not in _HANDLED_CHANGES:
+            return super().itemChange(change, value)
+        
         # テキスト編集中は位置変更を無効化
         if change == QGraphicsItem.ItemPositionChange and self.text_editor.is_editing:
             return self.pos()
         
         if change == QGraphicsItem.ItemPositionChange:
+            # Undo/Redoで記録済みの座標を復元する場合はそのまま適用
+            if self._view._restoring_positions:
+                return value
+            
             # サブツリードラッグ中の場合は制限を緩和（ただしグリッドスナップは適用）
             if self._view._subtree_drag_mode:
                 if self._view.get_grid_snap_enabled():
@@ -128,9 +247,11 @@ class NodeItem(QGraphicsRectItem):
         
         # 位置変更後にライン更新とサブツリードラッグ処理
         if change == QGraphicsItem.ItemPositionHasChanged:
+            self._invalidate_scene_rect()
             # サブツリードラッグ中でない場合のみ通常のライン更新を行う
-            if not self._view._subtree_drag_mode:
-                self._update_attached_lines()
+            # （前回の更新位置からの移動が画面上で1px未満なら見た目が変わらないため省略）
+            if not self._view._subtree_drag_mode and self._moved_since_edge_update(value):
+                self._schedule_edge_update()
             
             # サブツリードラッグ中の場合は子孫ノードを移動
             if self._view._subtree_drag_mode and self == self._view._subtree_drag_root:
@@ -139,15 +260,7 @@ class NodeItem(QGraphicsRectItem):
                     dx = current_pos.x() - self._view._subtree_drag_start_pos.x()
                     dy = current_pos.y() - self._view._subtree_drag_start_pos.y()
                     self._view.update_subtree_drag(dx, dy)
-            
-            # 複数ノード移動中の場合は接続線を更新
-            if self._view._is_multi_move_in_progress:
-                # このノードに関連する接続線を更新
-                for connection in self._view.connections:
-                    if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                        (connection.source == self or connection.target == self)):
-                        if hasattr(connection, 'update_connection'):
-                            connection.update_connection()
+            # 複数ノード移動中の接続線はビューの _pending_edges でまとめて更新される
         # 選択状態の変化を検知して枠線の太さを調整
         elif change == QGraphicsItem.ItemSelectedHasChanged:
             self._update_selection_style()
@@ -257,7 +370,7 @@ class NodeItem(QGraphicsRectItem):
             
             if move_distance > 5.0 and self._view.undo_stack is not None:
                 # 複数ノード移動中または複数ノード選択時は個別のUndoコマンドをプッシュしない
-                selected_nodes = [item for item in self._view.scene.selectedItems() if isinstance(item, NodeItem)]
+                selected_nodes = self._view.get_selected_nodes()
                 is_multi_move = (len(selected_nodes) > 1 or 
                                getattr(self._view, '_is_multi_move_in_progress', False) or
                                getattr(self._view, '_is_multi_move_undo_pending', False))
@@ -302,13 +415,10 @@ class NodeItem(QGraphicsRectItem):
         # ノードの色を更新
         if "node_bg" in theme and "node_border" in theme and "text_color" in theme:
             # ペンを更新
-            pen = QPen(QColor(theme["node_border"]))
-            pen.setWidth(2)
-            self.setPen(pen)
+            self.setPen(_theme_pen(theme["node_border"]))
             
             # ブラシを更新
-            brush = QBrush(QColor(theme["node_bg"]))
-            self.setBrush(brush)
+            self.setBrush(_theme_brush(theme["node_bg"]))
             
             # テキストの色を更新
             if hasattr(self, 'text_item'):
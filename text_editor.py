@@ -1,6 +1,8 @@
 """
 テキスト入力機能専用のクラス
 """
+from functools import lru_cache
+
 from PySide6.QtCore import Qt, QPointF, QTimer
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
@@ -11,6 +13,33 @@ from PySide6.QtWidgets import (
 )
 
 
+# 編集用LineEditのスタイルシート（編集のたびに文字列を組み立てない）
+_LINE_EDIT_QSS = """
+    QLineEdit {
+        background-color: white;
+        border: 2px solid #0078d4;
+        border-radius: 4px;
+        padding: 4px;
+        font-size: 12px;
+    }
+"""
+
+
+@lru_cache(maxsize=None)
+def _themed_line_edit_qss(text_color: str, node_bg: str, node_border: str) -> str:
+    """テーマの配色を反映した編集用LineEditのスタイルシートを取得（配色ごとに1回だけ組み立てる）"""
+    return f"""
+    QLineEdit {{
+        color: {text_color};
+        background-color: {node_bg};
+        border: 2px solid {node_border};
+        border-radius: 4px;
+        padding: 4px;
+        font-size: 12px;
+    }}
+"""
+
+
 class CustomLineEdit(QLineEdit):
     """カスタムLineEdit（Escapeキー処理用）"""
     
@@ -52,6 +81,7 @@ class NodeTextEditor:
         self.proxy_widget: QGraphicsProxyWidget | None = None
         self.is_editing = False
         self.original_text = ""
+        self._line_edit_qss = _LINE_EDIT_QSS  # テーマ変更時に更新
         
     def start_editing(self):
         """テキスト編集を開始"""
@@ -67,15 +97,7 @@ class NodeTextEditor:
         # LineEditを作成
         self.line_edit = CustomLineEdit(self, self.original_text)
         self.line_edit.setFont(QFont("Arial", 12))
-        self.line_edit.setStyleSheet("""
-            QLineEdit {
-                background-color: white;
-                border: 2px solid #0078d4;
-                border-radius: 4px;
-                padding: 4px;
-                font-size: 12px;
-            }
-        """)
+        self.line_edit.setStyleSheet(self._line_edit_qss)
         
         # 日本語入力（IME）の設定
         self.line_edit.setAttribute(Qt.WA_InputMethodEnabled, True)
@@ -89,9 +111,9 @@ class NodeTextEditor:
         self.proxy_widget.setWidget(self.line_edit)
         
         # 位置を調整（ノードの中央に配置）
-        text_rect = self.node_item.text_item.boundingRect()
-        self.proxy_widget.setPos(-text_rect.width() / 2, -text_rect.height() / 2)
-        self.proxy_widget.resize(text_rect.width() + 20, text_rect.height() + 10)
+        text_width, text_height = self.node_item.text_size()
+        self.proxy_widget.setPos(-text_width / 2, -text_height / 2)
+        self.proxy_widget.resize(text_width + 20, text_height + 10)
         
         # イベント接続
         self.line_edit.returnPressed.connect(self._finish_editing)
@@ -157,6 +179,15 @@ class NodeTextEditor:
         
         self.is_editing = False
         self.original_text = ""
+    
+    def update_theme(self, theme: dict):
+        """テーマを更新"""
+        if "text_color" in theme and "node_bg" in theme:
+            self._line_edit_qss = _themed_line_edit_qss(
+                theme["text_color"], theme["node_bg"], theme.get("node_border", "#333333"))
+            # 編集中のLineEditにも反映
+            if self.line_edit is not None:
+                self.line_edit.setStyleSheet(self._line_edit_qss)
 
 
 class SimpleTextEditor:
@@ -4,22 +4,21 @@
 import json
 import random
 import math
+from operator import itemgetter
 from node import NodeItem
-from PySide6.QtCore import QRectF, QPointF, Qt, QTimer
+from PySide6.QtCore import QLineF, QRectF, QPointF, QSignalBlocker, Qt, QTimer
 from PySide6.QtGui import (
     QBrush,
     QPainter,
     QPen,
     QUndoStack,
     QKeySequence,
-    QPixmap,
     QAction,
     QColor,
 )
 from PySide6.QtWidgets import (
     QGraphicsScene,
     QGraphicsView,
-    QGraphicsLineItem,
 )
 
 from node import NodeItem
@@ -36,6 +35,40 @@ from commands import (
     AlignGenerationsCommand,
 )
 
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:  # OpenGLモジュールを含まないビルド向け
+    QOpenGLWidget = None
+
+# 片側無限の範囲検索に使う十分大きな座標
+SCENE_QUERY_EXTENT = 1.0e6
+
+# ビューポートをOpenGL（GPU描画）にするか
+# 起動時はシーン背景が完全透明（背景透明度0）で、ラスタのビューポート越しにウィンドウの背景色が見える。
+# QOpenGLWidgetは自身のフレームバッファを塗りつぶして合成するため、透明なシーン背景の下に
+# ウィンドウが透けず既定の見た目が変わる。背景を不透明にして使う場合のみ有効にする
+USE_OPENGL_VIEWPORT = False
+
+# 方向キーでのノード移動時に最初に検索する半径（見つからなければ倍にして再検索）
+NAVIGATION_SEARCH_RADIUS = 256.0
+
+# 方向キーごとの (縦方向か, 向き, 現在位置と半径から指定方向の半平面の検索矩形を作る関数)
+_NAVIGATION_DIRECTIONS = {
+    Qt.Key_Up: (True, -1.0, lambda cx, cy, r: QRectF(cx - r, cy - r, 2 * r, r)),
+    Qt.Key_Down: (True, 1.0, lambda cx, cy, r: QRectF(cx - r, cy, 2 * r, r)),
+    Qt.Key_Left: (False, -1.0, lambda cx, cy, r: QRectF(cx - r, cy - r, r, 2 * r)),
+    Qt.Key_Right: (False, 1.0, lambda cx, cy, r: QRectF(cx, cy - r, r, 2 * r)),
+}
+
+# グリッドの濃い線の間隔と、薄い線を描画する最小の画面上の間隔（px）
+GRID_MAJOR_SIZE = 100
+GRID_MIN_MINOR_SPACING = 4.0
+_GRID_MINOR_PEN = QPen(QColor(200, 200, 200, 100), 1)
+_GRID_MAJOR_PEN = QPen(QColor(150, 150, 150, 200), 1)
+
+# ノードの再描画が必要になるテーマのキー
+_NODE_THEME_KEYS = frozenset(("node_bg", "node_border", "text_color"))
+
 
 class MindMapView(QGraphicsView):
     """
@@ -65,7 +98,12 @@ class MindMapView(QGraphicsView):
         super().__init__(parent)
         self.setRenderHints(self.renderHints() | QPainter.Antialiasing)
         self.setDragMode(QGraphicsView.RubberBandDrag)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # 変更されたアイテムの外接矩形のみ再描画する
+        # （FullViewportUpdate は微小アイテムが数千個あり更新領域の計算が支配的な場合のみ使う）
+        self.setViewportUpdateMode(QGraphicsView.BoundingRectViewportUpdate)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
+        if USE_OPENGL_VIEWPORT:
+            self._setup_opengl_viewport()
         
         # 複数アイテム移動を有効にする
         self.setRubberBandSelectionMode(Qt.IntersectsItemShape)
@@ -73,15 +111,26 @@ class MindMapView(QGraphicsView):
         self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
 
         self.scene = QGraphicsScene(self)
+        # 範囲検索（scene.items(rect)）をBSPツリーで高速化
+        self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
         self.setScene(self.scene)
         self.scene.setSceneRect(QRectF(-2000, -2000, 4000, 4000))
         
+        # 選択中ノードのキャッシュ（選択変更時に無効化）
+        self._selected_nodes: list[NodeItem] | None = None
+        # シーン上のノードの登録簿（全アイテムを走査せずにノードだけを辿るため）
+        self._node_items: list[NodeItem] = []  # 追加順のノード一覧
+        self._node_items_set: set[NodeItem] = set()  # 所属判定用
+        self.scene.selectionChanged.connect(self._invalidate_selected_nodes)
+        
+        # 背景描画の省略判定用フラグ（_set_scene_background で更新）
+        self._bg_skip = False
+        self._bg_opaque = False
+        
         # シーンの背景を透明に設定
-        self.scene.setBackgroundBrush(QBrush(Qt.transparent))
+        self._set_scene_background(QBrush(Qt.transparent))
         
-        # 背景透明化のための設定
-        self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        # 背景は塗らずに親ウィンドウの背景を見せる
         self.setStyleSheet("QGraphicsView { background: transparent; border: none; }")
 
         # 接続モード用の状態（デフォルトでOFF、Shiftキーで操作）
@@ -124,7 +173,9 @@ class MindMapView(QGraphicsView):
         self._subtree_drag_root = None
         self._subtree_drag_start_pos = None
         self._subtree_drag_snapshot = {}  # {node: original_position}
-        self._subtree_drag_edges_snapshot = {}  # {connection: original_control_points}
+        self._subtree_drag_connections = set()  # サブツリーに接続された線
+        # Undo/Redoで記録済みの座標を復元中か（復元時はスナップ・衝突判定を行わない）
+        self._restoring_positions = False
         
         # 透明度のパラメータ
         self.background_transparency = 1.0
@@ -143,6 +194,9 @@ class MindMapView(QGraphicsView):
         self._multi_move_start_positions: dict[NodeItem, QPointF] = {}
         self._is_multi_move_undo_pending = False
         self._is_multi_move_in_progress = False
+        # 複数ノード移動中に更新待ちの接続線（両端が移動しても1回だけ更新する）
+        self._pending_edges: set[CrankConnection] = set()
+        self._pending_edge_nodes: set[NodeItem] = set()  # 接続線が更新待ちのノード
         
         # Shiftキー状態の追跡
         self._shift_key_pressed = False
@@ -152,7 +206,6 @@ class MindMapView(QGraphicsView):
         self._attraction_timer = QTimer()
         self._attraction_timer.timeout.connect(self._update_attraction)
         self._original_positions = {}  # ノードの元の位置を保存
-        self._original_connections = {}  # 接続線の元の状態を保存
         
         # オートフィット機能
         self.auto_fit_enabled = False
@@ -160,6 +213,9 @@ class MindMapView(QGraphicsView):
         # 接続管理用のリスト
         self.connections: list[CrankConnection] = []
         
+        # 階層レベルのキャッシュ（ノード・エッジの追加削除時に無効化）
+        self._level_cache: dict[NodeItem, int] | None = None
+        
         # 整理（整列）設定
         self.ALIGN_MIN_GAP = 5.0  # 最小間隔
         self.LANE_X_SPACING = 180.0  # 世代ごとのX間隔（左端整列のための基準）
@@ -177,7 +233,7 @@ class MindMapView(QGraphicsView):
         if not hasattr(self, '_last_organize_positions') or not self._last_organize_positions:
             return True  # 初回は常に移動ありとみなす
         
-        current_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        current_nodes = self._node_items
         
         # ノード数が変わった場合は移動ありとみなす
         if len(current_nodes) != len(self._last_organize_positions):
@@ -221,7 +277,7 @@ class MindMapView(QGraphicsView):
                     return
             
             self.debug_print("世代整列処理開始")
-            all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+            all_nodes = self._node_items
             if not all_nodes:
                 self.debug_print("ノードが見つかりません")
                 return
@@ -401,7 +457,7 @@ class MindMapView(QGraphicsView):
             print("水平化後ノード重なり解消処理開始")
             
             # 全ノードを取得
-            all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+            all_nodes = list(self._node_items)
             if len(all_nodes) <= 1:
                 return
             
@@ -463,26 +519,51 @@ class MindMapView(QGraphicsView):
             traceback.print_exc()
 
     def _detect_connection_intersections(self) -> list:
-        """接続線の交差を検出"""
-        intersections = []
-        
-        for i, conn1 in enumerate(self.connections):
-            if not (hasattr(conn1, 'source') and hasattr(conn1, 'target')):
+        """接続線の交差を検出（外接矩形のX区間で候補を絞ってから線分を判定）"""
+        # 各接続線の外接矩形を1回だけ計算し、左端Xの昇順に並べる
+        entries = []
+        for index, connection in enumerate(self.connections):
+            if not (hasattr(connection, 'source') and hasattr(connection, 'target')):
                 continue
-                
-            for j, conn2 in enumerate(self.connections[i+1:], i+1):
-                if not (hasattr(conn2, 'source') and hasattr(conn2, 'target')):
+            # 座標はタプルに変換して保持（線分判定でQPointFのメソッド呼び出しを繰り返さない）
+            points = [(p.x(), p.y()) for p in self._get_connection_line_points(connection)]
+            xs = [x for x, _ in points]
+            ys = [y for _, y in points]
+            entries.append((min(xs), max(xs), min(ys), max(ys), index, connection, points))
+        entries.sort(key=itemgetter(0))
+        
+        # スイープ＆プルーン：X区間が重なる接続線どうしだけを比較する
+        found = []
+        active = []
+        for entry in entries:
+            left, _, top, bottom, index, conn1, points1 = entry
+            # 現在の左端より右端が左にある接続線はこれ以降も重ならない
+            active = [other for other in active if other[1] >= left]
+            for other in active:
+                # Y区間が重ならなければ交差しない
+                if other[3] < top or other[2] > bottom:
                     continue
+                conn2 = other[5]
                 
                 # 同じノードを共有する接続線はスキップ
                 if (conn1.source == conn2.source or conn1.source == conn2.target or
                     conn1.target == conn2.source or conn1.target == conn2.target):
                     continue
                 
-                # 接続線の交差をチェック
-                if self._check_connection_intersection(conn1, conn2):
-                    intersections.append((conn1, conn2))
-                    print(f"交差検出: {conn1.source.text_item.toPlainText()}->{conn1.target.text_item.toPlainText()} と {conn2.source.text_item.toPlainText()}->{conn2.target.text_item.toPlainText()}")
+                # 接続線の交差をチェック（元のリスト順で組を作る）
+                if self._polylines_intersect(points1, other[6]):
+                    if other[4] < index:
+                        found.append((other[4], index, conn2, conn1))
+                    else:
+                        found.append((index, other[4], conn1, conn2))
+            active.append(entry)
+        
+        # 従来どおり接続線リストの順で結果を返す
+        found.sort(key=itemgetter(0, 1))
+        intersections = []
+        for _, _, conn1, conn2 in found:
+            intersections.append((conn1, conn2))
+            print(f"交差検出: {conn1.source.text_item.toPlainText()}->{conn1.target.text_item.toPlainText()} と {conn2.source.text_item.toPlainText()}->{conn2.target.text_item.toPlainText()}")
         
         return intersections
 
@@ -490,24 +571,28 @@ class MindMapView(QGraphicsView):
         """2つの接続線が交差しているかチェック"""
         try:
             # 接続線の座標を取得
-            line1_points = self._get_connection_line_points(conn1)
-            line2_points = self._get_connection_line_points(conn2)
-            
-            # 各線分について交差をチェック
-            for i in range(len(line1_points) - 1):
-                for j in range(len(line2_points) - 1):
-                    if self._line_segments_intersect(
-                        line1_points[i], line1_points[i+1],
-                        line2_points[j], line2_points[j+1]
-                    ):
-                        return True
-            
-            return False
+            line1_points = [(p.x(), p.y()) for p in self._get_connection_line_points(conn1)]
+            line2_points = [(p.x(), p.y()) for p in self._get_connection_line_points(conn2)]
+            return self._polylines_intersect(line1_points, line2_points)
             
         except Exception as e:
             print(f"_check_connection_intersection エラー: {e}")
             return False
 
+    @classmethod
+    def _polylines_intersect(cls, points1: list[tuple[float, float]], points2: list[tuple[float, float]]) -> bool:
+        """2つの折れ線（座標タプルのリスト）が交差しているかチェック"""
+        segments2 = list(zip(points2, points2[1:]))
+        for (ax, ay), (bx, by) in zip(points1, points1[1:]):
+            for (cx, cy), (dx, dy) in segments2:
+                # 線分の外接矩形が重ならなければ交差しない
+                if (max(ax, bx) < min(cx, dx) or max(cx, dx) < min(ax, bx) or
+                        max(ay, by) < min(cy, dy) or max(cy, dy) < min(ay, by)):
+                    continue
+                if cls._segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+                    return True
+        return False
+
     def _get_connection_line_points(self, connection) -> list:
         """接続線の座標点を取得"""
         points = []
@@ -541,12 +626,15 @@ class MindMapView(QGraphicsView):
         
         return points
 
-    def _line_segments_intersect(self, p1, p2, p3, p4) -> bool:
-        """2つの線分が交差しているかチェック"""
-        def ccw(A, B, C):
-            return (C.y() - A.y()) * (B.x() - A.x()) > (B.y() - A.y()) * (C.x() - A.x())
-        
-        return ccw(p1, p3, p4) != ccw(p2, p3, p4) and ccw(p1, p2, p3) != ccw(p1, p2, p4)
+    @staticmethod
+    def _segments_intersect(ax: float, ay: float, bx: float, by: float,
+                            cx: float, cy: float, dx: float, dy: float) -> bool:
+        """2つの線分 AB と CD が交差しているかチェック（向き判定をインライン展開）"""
+        # ccw(A, C, D) != ccw(B, C, D)
+        if ((dy - ay) * (cx - ax) > (cy - ay) * (dx - ax)) == ((dy - by) * (cx - bx) > (cy - by) * (dx - bx)):
+            return False
+        # ccw(A, B, C) != ccw(A, B, D)
+        return ((cy - ay) * (bx - ax) > (by - ay) * (cx - ax)) != ((dy - ay) * (bx - ax) > (by - ay) * (dx - ax))
 
     def _resolve_all_intersections_at_once(self, intersections) -> None:
         """全ての交差を一度に解消"""
@@ -644,7 +732,7 @@ class MindMapView(QGraphicsView):
             print("最終ノード重なり解消処理開始")
             
             # 全ノードを取得
-            all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+            all_nodes = list(self._node_items)
             if len(all_nodes) <= 1:
                 return
             
@@ -706,7 +794,7 @@ class MindMapView(QGraphicsView):
             print("画面内コンパクト配置開始")
             
             # 全ノードを取得
-            all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+            all_nodes = self._node_items
             if len(all_nodes) <= 1:
                 return
             
@@ -791,14 +879,15 @@ class MindMapView(QGraphicsView):
             else:
                 pos = self.mapToScene(self.viewport().rect().center())
         
-        # 位置が指定されている場合は衝突検出を実行
+        # 位置が指定されている場合は衝突検出を実行（候補位置の周辺のみをシーンの空間インデックスで検索）
         if pos is not None:
-            all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
-            pos = self._find_collision_free_position(pos, all_nodes)
+            pos = self._find_collision_free_position(pos)
         
         node.setPos(pos)
         node.setOpacity(self.node_transparency)
         self.scene.addItem(node)
+        self._register_node(node)
+        self._invalidate_level_index()
         
         # レイアウトの再計算と再描画
         self.relayout()
@@ -864,31 +953,58 @@ class MindMapView(QGraphicsView):
         """背景透明度を設定"""
         self.background_transparency = transparency
         if transparency < 1.0:
-            self.scene.setBackgroundBrush(QBrush(Qt.transparent))
-            self.setAttribute(Qt.WA_TranslucentBackground, True)
-            self.setAttribute(Qt.WA_NoSystemBackground, True)
+            self._set_scene_background(QBrush(Qt.transparent))
             self.setStyleSheet("QGraphicsView { background: transparent; border: none; }")
         else:
-            self.scene.setBackgroundBrush(QBrush(Qt.white))
-            self.setAttribute(Qt.WA_TranslucentBackground, False)
-            self.setAttribute(Qt.WA_NoSystemBackground, False)
+            self._set_scene_background(QBrush(Qt.white))
             self.setStyleSheet("QGraphicsView { background: white; border: none; }")
 
+    def _setup_opengl_viewport(self):
+        """ビューポートをQOpenGLWidgetに置き換えてノード・接続線の描画をGPUで行う"""
+        if QOpenGLWidget is None:
+            print("OpenGLビューポートは利用できません（QtOpenGLWidgetsがありません）")
+            return
+        self.setViewport(QOpenGLWidget())
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        # 縮小表示時のコストを抑えるためアンチエイリアスは切る
+        self.setRenderHint(QPainter.Antialiasing, False)
+
+    def _set_scene_background(self, brush: QBrush):
+        """シーンの背景ブラシを設定し、描画の省略判定をキャッシュ"""
+        self.scene.setBackgroundBrush(brush)
+        style = brush.style()
+        alpha = brush.color().alpha()
+        # 完全透明なら描画自体を省略、完全不透明な単色ならブレンドせずコピー
+        self._bg_skip = style == Qt.NoBrush or (style == Qt.SolidPattern and alpha == 0)
+        self._bg_opaque = style == Qt.SolidPattern and alpha == 255
+    
+    def drawBackground(self, painter: QPainter, rect: QRectF):
+        """背景を描画（完全透明・完全不透明の場合は処理を簡略化し、グリッドは露出部分のみ描画）"""
+        if self._bg_skip:
+            pass
+        elif self._bg_opaque:
+            painter.save()
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            super().drawBackground(painter, rect)
+            painter.restore()
+        else:
+            super().drawBackground(painter, rect)
+        if self.grid_enabled:
+            self._draw_grid(painter, rect)
+    
     def set_node_transparency(self, transparency: float):
         """ノード透明度を設定"""
         if 0.0 <= transparency <= 1.0:
             self.node_transparency = transparency
-            for item in self.scene.items():
-                if isinstance(item, NodeItem):
-                    item.setOpacity(transparency)
+            for node in self._node_items:
+                node.setOpacity(transparency)
 
     def set_line_transparency(self, transparency: float):
         """接続線透明度を設定"""
         if 0.1 <= transparency <= 1.0:
             self.line_transparency = transparency
-            for item in self.scene.items():
-                if isinstance(item, QGraphicsLineItem):
-                    item.setOpacity(transparency)
+            for connection in self.connections:
+                connection.path_item.setOpacity(transparency)
     
     def set_window_transparency(self, transparency: float):
         """ウィンドウ透明度を設定"""
@@ -899,6 +1015,18 @@ class MindMapView(QGraphicsView):
             if parent_window:
                 parent_window.setWindowOpacity(transparency)
 
+    def apply_transparency(self, background: float, node: float, line: float, window: float):
+        """背景・ノード・接続線・ウィンドウの透明度をまとめて設定し、再描画を1回にまとめる"""
+        self.setUpdatesEnabled(False)
+        try:
+            self.set_background_transparency(background)
+            self.set_node_transparency(node)
+            self.set_line_transparency(line)
+            self.set_window_transparency(window)
+        finally:
+            self.setUpdatesEnabled(True)
+        self.viewport().update()
+
     def get_background_transparency(self) -> float:
         """現在の背景透明度を取得"""
         return self.background_transparency
@@ -961,55 +1089,52 @@ class MindMapView(QGraphicsView):
     
     def _is_any_node_editing(self) -> bool:
         """いずれかのノードがテキスト編集中かチェック"""
-        for item in self.scene.items():
-            if isinstance(item, NodeItem):
-                if hasattr(item, 'text_editor') and item.text_editor.is_editing:
-                    return True
+        for item in self._node_items:
+            if hasattr(item, 'text_editor') and item.text_editor.is_editing:
+                return True
         return False
     
     def _update_grid_display(self):
         """グリッド表示を更新"""
-        if self.grid_enabled:
-            self.scene.setBackgroundBrush(self._create_grid_brush())
-        else:
-            self.scene.setBackgroundBrush(QBrush(Qt.transparent))
+        # グリッド線は drawBackground で描画するため、背景ブラシは透明にする
+        self._set_scene_background(QBrush(Qt.transparent))
         # シーンの再描画を強制
         self.scene.update()
     
-    def _create_grid_brush(self):
-        """グリッドブラシを作成（100px毎に色を変える）"""
-        # 100pxの倍数でグリッドサイズを調整
-        major_grid_size = 100
+    def _draw_grid(self, painter: QPainter, rect: QRectF):
+        """露出した矩形内のグリッド線のみを描画（100px毎に色を変える）"""
         minor_grid_size = self.grid_size
-        
-        # パターンサイズを100pxの倍数に設定（最小100px）
-        pattern_size = max(major_grid_size, minor_grid_size)
-        # 100pxの倍数に調整
-        pattern_size = ((pattern_size - 1) // major_grid_size + 1) * major_grid_size
-        
-        pixmap = QPixmap(pattern_size, pattern_size)
-        pixmap.fill(Qt.transparent)
-        
-        painter = QPainter(pixmap)
-        
-        # 薄いグリッド線（通常のグリッド）
-        painter.setPen(QPen(QColor(200, 200, 200, 100), 1))  # 薄いグレー
-        for i in range(0, pattern_size, minor_grid_size):
-            if i % major_grid_size != 0:  # 100pxの倍数でない場合のみ
-                painter.drawLine(i, 0, i, pattern_size - 1)
-                painter.drawLine(0, i, pattern_size - 1, i)
-        
-        # 濃いグリッド線（100px毎）
-        painter.setPen(QPen(QColor(150, 150, 150, 200), 1))  # 濃いグレー
-        for i in range(0, pattern_size + 1, major_grid_size):
-            painter.drawLine(i, 0, i, pattern_size)
-            painter.drawLine(0, i, pattern_size, i)
-        
-        painter.end()
-        
-        brush = QBrush(pixmap)
-        brush.setTransform(brush.transform().translate(0, 0))
-        return brush
+        left = math.floor(rect.left() / minor_grid_size) * minor_grid_size
+        top = math.floor(rect.top() / minor_grid_size) * minor_grid_size
+        right = rect.right()
+        bottom = rect.bottom()
+        
+        minor_lines = []
+        major_lines = []
+        # 縮小表示で薄いグリッド線が密集する場合は濃いグリッド線のみ描画
+        draw_minor = minor_grid_size * painter.worldTransform().m11() >= GRID_MIN_MINOR_SPACING
+        
+        x = left
+        while x <= right:
+            if x % GRID_MAJOR_SIZE == 0:
+                major_lines.append(QLineF(x, rect.top(), x, bottom))
+            elif draw_minor:
+                minor_lines.append(QLineF(x, rect.top(), x, bottom))
+            x += minor_grid_size
+        y = top
+        while y <= bottom:
+            if y % GRID_MAJOR_SIZE == 0:
+                major_lines.append(QLineF(rect.left(), y, right, y))
+            elif draw_minor:
+                minor_lines.append(QLineF(rect.left(), y, right, y))
+            y += minor_grid_size
+        
+        if minor_lines:
+            painter.setPen(_GRID_MINOR_PEN)  # 薄いグレー
+            painter.drawLines(minor_lines)
+        if major_lines:
+            painter.setPen(_GRID_MAJOR_PEN)  # 濃いグレー
+            painter.drawLines(major_lines)
     
     def snap_to_grid(self, pos: QPointF, threshold: float = None) -> QPointF:
         """位置をグリッドにスナップ（カクカクしたスナップ）"""
@@ -1041,7 +1166,7 @@ class MindMapView(QGraphicsView):
 
     def fit_all_nodes(self):
         """全てのノードが画面に収まるように調整"""
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         if not all_nodes:
             return
         
@@ -1066,24 +1191,10 @@ class MindMapView(QGraphicsView):
         
         # 全てのノードの元の位置を保存
         self._original_positions.clear()
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         for node in all_nodes:
             self._original_positions[node] = node.pos()
         
-        # 全ての接続線の元の状態を保存
-        self._original_connections.clear()
-        for connection in self.connections:
-            if hasattr(connection, 'source') and hasattr(connection, 'target'):
-                # 接続線の詳細な状態を保存
-                connection_data = {
-                    'source': connection.source,
-                    'target': connection.target,
-                    'horizontal_line1_line': connection.horizontal_line1.line() if connection.horizontal_line1 else None,
-                    'vertical_line_line': connection.vertical_line.line() if connection.vertical_line else None,
-                    'horizontal_line2_line': connection.horizontal_line2.line() if connection.horizontal_line2 else None,
-                }
-                self._original_connections[id(connection)] = connection_data
-        
         # タイマーを開始（30FPS）
         self._attraction_timer.start(33)  # 約30FPS
 
@@ -1102,36 +1213,22 @@ class MindMapView(QGraphicsView):
         # ノード位置の復元後にシーンを一度更新
         self.scene.update()
         
-        # 全ての接続線を元の状態に戻す
+        # 接続線はノード位置から再計算して元の状態に戻す
         for connection in self.connections:
-            connection_id = id(connection)
-            if connection_id in self._original_connections:
-                # 保存された接続線の状態を復元
-                original_data = self._original_connections[connection_id]
-                if connection.horizontal_line1 and original_data['horizontal_line1_line']:
-                    connection.horizontal_line1.setLine(original_data['horizontal_line1_line'])
-                if connection.vertical_line and original_data['vertical_line_line']:
-                    connection.vertical_line.setLine(original_data['vertical_line_line'])
-                if connection.horizontal_line2 and original_data['horizontal_line2_line']:
-                    connection.horizontal_line2.setLine(original_data['horizontal_line2_line'])
-            else:
-                # フォールバック: 通常の更新
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+            connection.update_connection()
         
         # 最終的なシーンの更新
         self.scene.update()
         
-        # 元の位置と接続線の状態をクリア
+        # 元の位置をクリア
         self._original_positions.clear()
-        self._original_connections.clear()
 
     def _update_attraction(self):
         """アトラクションモードの更新処理"""
         if not self._attraction_mode:
             return
         
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         if not all_nodes:
             return
         
@@ -1162,19 +1259,16 @@ class MindMapView(QGraphicsView):
             # ノードの位置を更新
             node.setPos(new_x, new_y)
         
-        # 接続線を更新
+        # 接続線を更新（変更された線の領域のみが再描画される）
         for connection in self.connections:
             if hasattr(connection, 'update_connection'):
                 connection.update_connection()
-        
-        # シーンを更新
-        self.scene.update()
 
     def mousePressEvent(self, event):
         """マウスプレスイベント"""
         # 複数ノード選択時の移動開始位置を記録
         if event.button() == Qt.LeftButton:
-            selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+            selected_nodes = self.get_selected_nodes()
             if len(selected_nodes) > 1:
                 self._multi_move_start_positions.clear()
                 self._is_multi_move_in_progress = True
@@ -1204,19 +1298,8 @@ class MindMapView(QGraphicsView):
 
     def mouseMoveEvent(self, event):
         """マウス移動イベント"""
-        if self._is_multi_move_in_progress:
-            # 複数ノード移動中の接続線更新
-            selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
-            for connection in self.connections:
-                if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                    (connection.source in selected_nodes or connection.target in selected_nodes)):
-                    # 接続線の更新メソッドを呼び出し
-                    if hasattr(connection, 'update_connection'):
-                        connection.update_connection()
-            # シーンの再描画
-            self.scene.update()
-        
-        
+        # 複数ノード移動中の接続線は各ノードが _pending_edges に登録し、まとめて更新される
+        # シーン全体は再描画しない（setPos/setPath が移動前後の領域のみを無効化する）
         super().mouseMoveEvent(event)
     
     
@@ -1274,40 +1357,35 @@ class MindMapView(QGraphicsView):
         # 重複実行を防ぐ
         if not self._is_multi_move_in_progress or self._is_multi_move_undo_pending:
             return
+        
+        # 移動中に更新待ちになっていた接続線を反映
+        self._flush_pending_edges()
             
         if not self._multi_move_start_positions:
             self._is_multi_move_in_progress = False
             return
         
-        selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        selected_nodes = self.get_selected_nodes()
         
         if len(selected_nodes) <= 1:
             self._is_multi_move_in_progress = False
             self._multi_move_start_positions.clear()
             return
         
-        # 各ノードの移動量を個別に計算
+        # 各ノードの移動前後の位置を記録（スナップによりノードごとに移動量が異なる）
         old_positions = []
         new_positions = []
         has_movement = False
         
         for node in selected_nodes:
-            if node in self._multi_move_start_positions:
-                old_pos = self._multi_move_start_positions[node]
-                new_pos = node.pos()
-                
-                # 移動距離をチェック
-                move_distance = ((new_pos.x() - old_pos.x()) ** 2 + (new_pos.y() - old_pos.y()) ** 2) ** 0.5
-                if move_distance > 1.0:
-                    has_movement = True
-                
-                old_positions.append(old_pos)
-                new_positions.append(new_pos)
-            else:
-                # 開始位置が記録されていない場合は現在位置を使用
-                current_pos = node.pos()
-                old_positions.append(current_pos)
-                new_positions.append(current_pos)
+            # 開始位置が記録されていない場合は現在位置を使用
+            old_pos = self._multi_move_start_positions.get(node, node.pos())
+            new_pos = node.pos()
+            # 移動距離をチェック
+            if ((new_pos.x() - old_pos.x()) ** 2 + (new_pos.y() - old_pos.y()) ** 2) ** 0.5 > 1.0:
+                has_movement = True
+            old_positions.append(old_pos)
+            new_positions.append(new_pos)
         
         # 衝突検出：選択ノード群のいずれかが他ノードに重なる場合は全体を元位置に戻す
         collision_detected = False
@@ -1322,8 +1400,8 @@ class MindMapView(QGraphicsView):
                         n.boundingRect().width(),
                         n.boundingRect().height(),
                     )
-                    for item in self.scene.items():
-                        if isinstance(item, NodeItem) and item not in selected_nodes:
+                    for item in self._node_items:
+                        if item not in selected_nodes:
                             item_rect = item.sceneBoundingRect()
                             expanded_rect = QRectF(
                                 item_rect.x() - margin,
@@ -1345,9 +1423,7 @@ class MindMapView(QGraphicsView):
                 if node in self._multi_move_start_positions:
                     node.setPos(self._multi_move_start_positions[node])
             # 接続線更新
-            for connection in self.connections:
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+            self._update_edges_for_nodes(selected_nodes)
             self.scene.update()
             # 状態リセット
             self._is_multi_move_in_progress = False
@@ -1369,12 +1445,7 @@ class MindMapView(QGraphicsView):
             print(f"複数ノード移動Undoコマンドをスキップ: 移動なし (has_movement={has_movement})")
         
         # 移動したノードに関連する接続線を更新
-        for connection in self.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source in selected_nodes or connection.target in selected_nodes)):
-                # 接続線の更新メソッドを呼び出し
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+        self._update_edges_for_nodes(selected_nodes)
         
         # 状態をクリア
         self._is_multi_move_in_progress = False
@@ -1425,7 +1496,7 @@ class MindMapView(QGraphicsView):
 
     def _start_text_editing_with_enter(self):
         """Enterキーでテキスト編集を開始"""
-        selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        selected_nodes = self.get_selected_nodes()
         if len(selected_nodes) != 1:
             return
         
@@ -1435,20 +1506,25 @@ class MindMapView(QGraphicsView):
 
     def _select_all_nodes(self):
         """全てのノードを選択"""
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         
         if not all_nodes:
             return
         
-        for node in all_nodes:
-            node.setSelected(True)
+        # 選択中はシーンのシグナルを止め、selectionChangedは最後に1回だけ通知する
+        # （setSelectionAreaは完全に透明なノードを選択しないため各ノードを直接選択する）
+        with QSignalBlocker(self.scene):
+            for node in all_nodes:
+                node.setSelected(True)
+        self._invalidate_selected_nodes()
+        self.scene.selectionChanged.emit()
         
         if hasattr(self.parent(), 'statusBar'):
             self.parent().statusBar().showMessage(f"{len(all_nodes)}個のノードを選択しました", 2000)
 
     def _delete_selected_nodes(self):
         """選択されたノードを削除"""
-        selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        selected_nodes = self.get_selected_nodes()
         if not selected_nodes:
             return
         
@@ -1457,7 +1533,7 @@ class MindMapView(QGraphicsView):
                 self.undo_stack.push(DeleteNodeCommand(self, node))
         else:
             for node in selected_nodes:
-                self.scene.removeItem(node)
+                self.remove_node(node)
         
         # オートフィットが有効な場合は自動的にフィット
         if self.auto_fit_enabled:
@@ -1465,7 +1541,7 @@ class MindMapView(QGraphicsView):
 
     def _add_node_with_tab(self):
         """Tabキーでノード追加"""
-        selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        selected_nodes = self.get_selected_nodes()
         
         if selected_nodes:
             parent_node = selected_nodes[0]
@@ -1476,8 +1552,7 @@ class MindMapView(QGraphicsView):
                 new_node = self.add_node("新規ノード", new_pos)
                 self._create_edge(parent_node, new_node)
                 # 新しく作成されたノードを選択
-                for item in self.scene.selectedItems():
-                    item.setSelected(False)
+                self.scene.clearSelection()
                 new_node.setSelected(True)
         else:
             if self.undo_stack is not None:
@@ -1485,19 +1560,19 @@ class MindMapView(QGraphicsView):
             else:
                 new_node = self.add_node("新規ノード", None, True)
                 # 新しく作成されたノードを選択
-                for item in self.scene.selectedItems():
-                    item.setSelected(False)
+                self.scene.clearSelection()
                 new_node.setSelected(True)
 
 
 
     def _create_edge(self, source: NodeItem, target: NodeItem) -> CrankConnection:
         """エッジを作成"""
-        connection = CrankConnection(self.scene, source, target)
+        connection = CrankConnection(self.scene, source, target, self.line_transparency)
         source.attach_edge(connection, target)
         target.attach_edge(connection, source)
         # 接続をリストに追加
         self.connections.append(connection)
+        self._invalidate_level_index()
         return connection
 
     def remove_edge(self, connection: CrankConnection, source: NodeItem, target: NodeItem):
@@ -1508,6 +1583,39 @@ class MindMapView(QGraphicsView):
         # 接続をリストから削除
         if connection in self.connections:
             self.connections.remove(connection)
+        self._invalidate_level_index()
+
+    def remove_node(self, node: NodeItem):
+        """ノードをシーンから取り除く（接続線は呼び出し側で削除する）"""
+        self.scene.removeItem(node)
+        self._unregister_node(node)
+        self._invalidate_level_index()
+
+    def restore_node(self, node: NodeItem):
+        """remove_nodeで取り除いたノードをシーンに戻す"""
+        self.scene.addItem(node)
+        self._register_node(node)
+        self._invalidate_level_index()
+
+    def _register_node(self, node: NodeItem):
+        """ノードを登録簿に追加"""
+        if node not in self._node_items_set:
+            self._node_items_set.add(node)
+            self._node_items.append(node)
+
+    def _unregister_node(self, node: NodeItem):
+        """ノードを登録簿から取り除く"""
+        if node in self._node_items_set:
+            self._node_items_set.discard(node)
+            self._node_items.remove(node)
+
+    def restore_edge(self, connection: CrankConnection, source: NodeItem, target: NodeItem):
+        """remove_edgeで削除したエッジを復元"""
+        connection.restore()
+        source.attach_edge(connection, target)
+        target.attach_edge(connection, source)
+        self.connections.append(connection)
+        self._invalidate_level_index()
 
     def _calculate_smart_position(self, parent_node: NodeItem) -> QPointF:
         """スマートな位置を計算（他の親ノードの子ノード群との衝突を考慮）"""
@@ -1572,7 +1680,7 @@ class MindMapView(QGraphicsView):
 
     def _calculate_parent_node_position(self) -> QPointF:
         """新しい親ノードの配置位置を計算（既存の親ノードの子ノード群の下に配置）"""
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         
         if not all_nodes:
             return self.mapToScene(self.viewport().rect().center())
@@ -1642,7 +1750,7 @@ class MindMapView(QGraphicsView):
     def _get_child_nodes(self, parent_node: NodeItem) -> list[NodeItem]:
         """指定されたノードの子ノードを取得"""
         child_nodes = []
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         
         for node in all_nodes:
             if node == parent_node:
@@ -1693,7 +1801,6 @@ class MindMapView(QGraphicsView):
         
         # スナップショットを作成
         self._subtree_drag_snapshot = {}
-        self._subtree_drag_edges_snapshot = {}
         
         # ルートノードの位置を記録
         self._subtree_drag_snapshot[root_node] = root_node.pos()
@@ -1707,30 +1814,16 @@ class MindMapView(QGraphicsView):
             self._subtree_drag_snapshot[descendant] = descendant.pos()
             self._subtree_drag_original_positions[descendant] = descendant.pos()
         
-        # サブツリー内の接続線の制御点を記録
-        for connection in self.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source == root_node or connection.source in descendants or
-                 connection.target == root_node or connection.target in descendants)):
-                # 接続線の制御点を記録（CrankConnectionの場合は各線分の位置）
-                if hasattr(connection, 'horizontal_line1') and hasattr(connection, 'vertical_line') and hasattr(connection, 'horizontal_line2'):
-                    self._subtree_drag_edges_snapshot[connection] = {
-                        'h1_start': connection.horizontal_line1.line().p1(),
-                        'h1_end': connection.horizontal_line1.line().p2(),
-                        'v_start': connection.vertical_line.line().p1(),
-                        'v_end': connection.vertical_line.line().p2(),
-                        'h2_start': connection.horizontal_line2.line().p1(),
-                        'h2_end': connection.horizontal_line2.line().p2()
-                    }
+        # サブツリーに接続された線を記録（親ノードへの接続線を含む）
+        self._subtree_drag_connections = {
+            connection
+            for node in self._subtree_drag_snapshot
+            for connection, _ in node._edges
+        }
         
         # サブツリー内のすべての接続線を更新（初期状態を確実にするため）
-        for connection in self.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source in self._subtree_drag_snapshot or 
-                 connection.target in self._subtree_drag_snapshot)):
-                # 接続線の更新メソッドを呼び出し
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+        for connection in self._subtree_drag_connections:
+            connection.update_connection()
     
     def update_subtree_drag(self, dx: float, dy: float):
         """
@@ -1748,33 +1841,12 @@ class MindMapView(QGraphicsView):
             new_pos = QPointF(original_pos.x() + dx, original_pos.y() + dy)
             node.setPos(new_pos)
         
-        # 接続線の制御点を更新
-        for connection, original_points in self._subtree_drag_edges_snapshot.items():
-            if hasattr(connection, 'horizontal_line1') and hasattr(connection, 'vertical_line') and hasattr(connection, 'horizontal_line2'):
-                # 各線分の制御点を平行移動
-                h1_start = QPointF(original_points['h1_start'].x() + dx, original_points['h1_start'].y() + dy)
-                h1_end = QPointF(original_points['h1_end'].x() + dx, original_points['h1_end'].y() + dy)
-                v_start = QPointF(original_points['v_start'].x() + dx, original_points['v_start'].y() + dy)
-                v_end = QPointF(original_points['v_end'].x() + dx, original_points['v_end'].y() + dy)
-                h2_start = QPointF(original_points['h2_start'].x() + dx, original_points['h2_start'].y() + dy)
-                h2_end = QPointF(original_points['h2_end'].x() + dx, original_points['h2_end'].y() + dy)
-                
-                # 線分を更新
-                connection.horizontal_line1.setLine(h1_start.x(), h1_start.y(), h1_end.x(), h1_end.y())
-                connection.vertical_line.setLine(v_start.x(), v_start.y(), v_end.x(), v_end.y())
-                connection.horizontal_line2.setLine(h2_start.x(), h2_start.y(), h2_end.x(), h2_end.y())
-        
         # サブツリー内のすべての接続線を更新（移動中のノードとその親ノードを繋ぐ接続線を含む）
-        for connection in self.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source in self._subtree_drag_snapshot or 
-                 connection.target in self._subtree_drag_snapshot)):
-                # 接続線の更新メソッドを呼び出し
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
-        
-        # シーンの再描画を強制
-        self.scene.update()
+        for connection in self._subtree_drag_connections:
+            connection.update_connection()
+        for node in self._subtree_drag_snapshot:
+            node.mark_edges_updated()
+        # シーン全体の再描画は不要（移動したノードと接続線の前後の領域のみ再描画される）
     
     def end_subtree_drag(self, apply_snap: bool = True):
         """
@@ -1803,31 +1875,21 @@ class MindMapView(QGraphicsView):
         # Undoスタックに追加
         if self.undo_stack is not None:
             # 移動前後の位置を記録
-            old_positions = {}
-            new_positions = {}
-            
-            for node, original_pos in self._subtree_drag_snapshot.items():
-                old_positions[node] = original_pos
-                new_positions[node] = node.pos()
+            new_positions = {node: node.pos() for node in self._subtree_drag_snapshot}
             
             # Undoコマンドを追加
-            self.undo_stack.push(SubtreeMoveCommand(self, self._subtree_drag_root, old_positions, new_positions, self._subtree_drag_edges_snapshot))
+            self.undo_stack.push(SubtreeMoveCommand(self, self._subtree_drag_root, self._subtree_drag_snapshot, new_positions))
         
         # サブツリー内のすべての接続線を最終更新
-        for connection in self.connections:
-            if (hasattr(connection, 'source') and hasattr(connection, 'target') and
-                (connection.source in self._subtree_drag_snapshot or 
-                 connection.target in self._subtree_drag_snapshot)):
-                # 接続線の更新メソッドを呼び出し
-                if hasattr(connection, 'update_connection'):
-                    connection.update_connection()
+        for connection in self._subtree_drag_connections:
+            connection.update_connection()
         
         # 状態をクリア
         self._subtree_drag_mode = False
         self._subtree_drag_root = None
         self._subtree_drag_start_pos = None
         self._subtree_drag_snapshot.clear()
-        self._subtree_drag_edges_snapshot.clear()
+        self._subtree_drag_connections.clear()
         
         # レイアウトの再計算と再描画
         self.relayout()
@@ -1835,7 +1897,7 @@ class MindMapView(QGraphicsView):
     
     def _check_collision(self, bbox: dict, exclude_node: NodeItem = None) -> bool:
         """指定された境界ボックスが他のノードと衝突するかチェック"""
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         
         for node in all_nodes:
             if node == exclude_node:
@@ -1915,7 +1977,7 @@ class MindMapView(QGraphicsView):
             QPointF: 新しい親ノードの配置位置
         """
         # すべての既存の親ノードを取得
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
+        all_nodes = self._node_items
         all_parent_nodes = self._get_all_parent_nodes(all_nodes)
         
         # すべての親ノードのサブツリーの最下端を計算
@@ -2011,33 +2073,29 @@ class MindMapView(QGraphicsView):
                 return True
         return False
 
-    def _find_collision_free_position(self, pos: QPointF, all_nodes: list[NodeItem]) -> QPointF:
+    def _find_collision_free_position(self, pos: QPointF) -> QPointF:
         """衝突しない位置を検索"""
         node_width = 128
         node_height = 72
         min_spacing = 20
         
         # 指定位置が空いているかチェック
-        if self._is_position_free(pos, node_width, node_height, min_spacing, all_nodes):
+        if self._is_position_free(pos, node_width, node_height, min_spacing):
             return pos
         
         # 螺旋状に検索
-        return self._find_nearest_free_position(pos, node_width, node_height, min_spacing, all_nodes)
+        return self._find_nearest_free_position(pos, node_width, node_height, min_spacing)
 
-    def _is_position_free(self, pos: QPointF, node_width: float, node_height: float, min_spacing: float, all_nodes: list[NodeItem]) -> bool:
-        """位置が空いているかチェック"""
+    def _is_position_free(self, pos: QPointF, node_width: float, node_height: float, min_spacing: float) -> bool:
+        """位置が空いているかチェック（矩形と交差するノードのみを空間インデックスで取得）"""
         test_rect = QRectF(pos.x() - node_width/2 - min_spacing, 
                           pos.y() - node_height/2 - min_spacing,
                           node_width + min_spacing*2, 
                           node_height + min_spacing*2)
         
-        for node in all_nodes:
-            node_rect = node.sceneBoundingRect()
-            if test_rect.intersects(node_rect):
-                return False
-        return True
+        return not self._nodes_in_rect(test_rect)
 
-    def _find_nearest_free_position(self, center_pos: QPointF, node_width: float, node_height: float, min_spacing: float, all_nodes: list[NodeItem]) -> QPointF:
+    def _find_nearest_free_position(self, center_pos: QPointF, node_width: float, node_height: float, min_spacing: float) -> QPointF:
         """最も近い空いている位置を検索"""
         step = 50
         max_radius = 1000
@@ -2049,14 +2107,14 @@ class MindMapView(QGraphicsView):
                 y = center_pos.y() + radius * math.sin(math.radians(angle))
                 test_pos = QPointF(x, y)
                 
-                if self._is_position_free(test_pos, node_width, node_height, min_spacing, all_nodes):
+                if self._is_position_free(test_pos, node_width, node_height, min_spacing):
                     return test_pos
         
         # 見つからない場合は中心位置を返す
         return center_pos
 
     def _is_position_free_for_node(self, pos: QPointF, moving_node: NodeItem) -> bool:
-        """移動するノード用の位置チェック"""
+        """移動するノード用の位置チェック（矩形と交差するノードのみを空間インデックスで取得）"""
         try:
             node_width = 128
             node_height = 72
@@ -2067,14 +2125,9 @@ class MindMapView(QGraphicsView):
                               node_width + min_spacing*2, 
                               node_height + min_spacing*2)
             
-            all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
-            
-            for node in all_nodes:
-                if node == moving_node:
-                    continue
-                
-                node_rect = node.sceneBoundingRect()
-                if test_rect.intersects(node_rect):
+            # 自身以外の交差するノードが1つでもあれば空いていない
+            for node in self._nodes_in_rect(test_rect):
+                if node is not moving_node:
                     return False
             
             return True
@@ -2085,61 +2138,154 @@ class MindMapView(QGraphicsView):
         """関連ノードを移動すべきかチェック"""
         return False  # 簡略化のため常にFalse
 
-    def _calculate_node_level(self, node: NodeItem, all_nodes: list[NodeItem]) -> int:
+    def _calculate_node_level(self, node: NodeItem, all_nodes: list[NodeItem] | None = None) -> int:
         """ノードの階層レベルを計算"""
-        return 0  # 簡略化のため常に0
+        return self._get_level_cache().get(node, 0)
+
+    def get_selected_nodes(self) -> list[NodeItem]:
+        """選択中のノード一覧を取得（選択が変わるまでキャッシュを再利用）"""
+        if self._selected_nodes is None:
+            self._selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        return self._selected_nodes
+
+    def _invalidate_selected_nodes(self) -> None:
+        """選択中ノードのキャッシュを無効化"""
+        self._selected_nodes = None
+
+    def _invalidate_level_index(self) -> None:
+        """階層レベルのキャッシュを無効化"""
+        self._level_cache = None
+
+    def _get_level_cache(self) -> dict[NodeItem, int]:
+        """階層レベルのキャッシュを取得（無効なら再構築）"""
+        if self._level_cache is None:
+            self._rebuild_level_index()
+        return self._level_cache
+
+    def _rebuild_level_index(self) -> None:
+        """ルートからのBFSで階層レベルを再計算"""
+        all_nodes = self._node_items
+        children: dict[NodeItem, list[NodeItem]] = {}
+        has_parent = set()
+        for connection in self.connections:
+            children.setdefault(connection.source, []).append(connection.target)
+            has_parent.add(connection.target)
+        
+        levels: dict[NodeItem, int] = {}
+        queue = [node for node in all_nodes if node not in has_parent]
+        for node in queue:
+            levels[node] = 0
+        # キューはインデックスで走査（pop(0)のO(N)を避ける）
+        index = 0
+        while index < len(queue):
+            node = queue[index]
+            index += 1
+            for child in children.get(node, ()):
+                if child not in levels:
+                    levels[child] = levels[node] + 1
+                    queue.append(child)
+        
+        # 循環のみで構成されたノードはレベル0扱い
+        for node in all_nodes:
+            levels.setdefault(node, 0)
+        
+        self._level_cache = levels
+
+    def _queue_edge_updates(self, node: NodeItem) -> None:
+        """ノードの接続線を更新待ちに追加（次のイベントループ処理で重複なくまとめて更新）"""
+        if not self._pending_edges:
+            QTimer.singleShot(0, self._flush_pending_edges)
+        self._pending_edges.update(connection for connection, _ in node._edges)
+        self._pending_edge_nodes.add(node)
+
+    def _flush_pending_edges(self) -> None:
+        """更新待ちの接続線を1回ずつ更新"""
+        pending = self._pending_edges
+        if not pending:
+            return
+        self._pending_edges = set()
+        for connection in pending:
+            connection.update_connection()
+        for node in self._pending_edge_nodes:
+            node.mark_edges_updated()
+        self._pending_edge_nodes = set()
+
+    def _update_edges_for_nodes(self, nodes) -> None:
+        """ノード群に接続された線のみを重複なく1回ずつ更新（全接続線の走査を避ける）"""
+        for connection in {connection for node in nodes for connection, _ in node._edges}:
+            connection.update_connection()
+        for node in nodes:
+            node.mark_edges_updated()
+
+    def _nodes_in_rect(self, rect: QRectF) -> list[NodeItem]:
+        """矩形と交差するノードを取得（シーンの空間インデックスを使用）"""
+        # インデックス検索は完全に透明なアイテムを返さないため、透明度0のときは登録簿を走査する
+        if self.node_transparency <= 0.0:
+            return [node for node in self._node_items if node.sceneBoundingRect().intersects(rect)]
+        return [item for item in self.scene.items(rect, Qt.IntersectsItemBoundingRect)
+                if isinstance(item, NodeItem)]
+
+    def _get_nodes_right_of(self, node: NodeItem) -> list[NodeItem]:
+        """同じ階層レベルでノードより右側にあるノードを取得"""
+        levels = self._get_level_cache()
+        level = levels.get(node, 0)
+        x = node.pos().x()
+        # ノードの右側の帯のみを検索
+        rect = QRectF(x, -SCENE_QUERY_EXTENT, SCENE_QUERY_EXTENT, 2 * SCENE_QUERY_EXTENT)
+        return [n for n in self._nodes_in_rect(rect)
+                if n is not node and n.pos().x() > x and levels.get(n, 0) == level]
 
     def _navigate_to_nearest_node(self, direction: Qt.Key):
         """最寄りのノードに選択移動（マップ自体は動かさない）"""
-        selected_nodes = [item for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        selected_nodes = self.get_selected_nodes()
         if not selected_nodes:
             return
         
-        current_node = selected_nodes[0]
-        all_nodes = [item for item in self.scene.items() if isinstance(item, NodeItem)]
-        
-        if len(all_nodes) <= 1:
+        # 方向ごとの判定（縦方向か・向き・検索矩形）は呼び出しごとに1回だけ引く
+        spec = _NAVIGATION_DIRECTIONS.get(direction)
+        if spec is None:
             return
+        vertical, sign, search_rect = spec
+        
+        current_node = selected_nodes[0]
+        cx = current_node.pos().x()
+        cy = current_node.pos().y()
         
         # 方向に応じて最寄りのノードを検索
+        # 指定方向の半平面を半径radiusの矩形で空間インデックスから取得し、見つからなければ半径を倍にする
+        # （半径以内に候補があれば、それより近いノードは必ず矩形内にあるため最寄りとなる）
         nearest_node = None
-        min_distance = float('inf')
-        
-        for node in all_nodes:
-            if node == current_node:
-                continue
-            
-            dx = node.pos().x() - current_node.pos().x()
-            dy = node.pos().y() - current_node.pos().y()
-            
-            if direction == Qt.Key_Up and dy < 0:
-                distance = (dx*dx + dy*dy) ** 0.5
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_node = node
-            elif direction == Qt.Key_Down and dy > 0:
-                distance = (dx*dx + dy*dy) ** 0.5
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_node = node
-            elif direction == Qt.Key_Left and dx < 0:
-                distance = (dx*dx + dy*dy) ** 0.5
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_node = node
-            elif direction == Qt.Key_Right and dx > 0:
-                distance = (dx*dx + dy*dy) ** 0.5
-                if distance < min_distance:
-                    min_distance = distance
+        radius = NAVIGATION_SEARCH_RADIUS
+        while nearest_node is None and radius <= SCENE_QUERY_EXTENT:
+            rect = search_rect(cx, cy, radius)
+            
+            # 候補ごとに位置を1回だけ取得し、距離は平方のまま比較する（平方根を取らない）
+            candidates = []
+            for node in self._nodes_in_rect(rect):
+                if node is current_node:
+                    continue
+                pos = node.pos()
+                dx = pos.x() - cx
+                dy = pos.y() - cy
+                if (dy if vertical else dx) * sign > 0:
+                    candidates.append((dx*dx + dy*dy, node))
+            if candidates:
+                distance_sq, node = min(candidates, key=itemgetter(0))
+                if distance_sq <= radius * radius:
                     nearest_node = node
+            radius *= 2
         
         if nearest_node:
             current_node.setSelected(False)
             nearest_node.setSelected(True)
             # ビューをスクロールせず、選択のみ変更
 
-    def _export_to_json(self) -> str:
-        """JSONにエクスポート"""
+    def _export_to_json(self, fp):
+        """JSONとしてファイルに書き出す（C実装のjson.dumpsで一括エンコードし、1回で書き込む）"""
+        fp.write(json.dumps(self._export_to_dict(), ensure_ascii=False, separators=(',', ':')))
+
+    def _export_to_dict(self) -> dict:
+        """ノードとエッジを辞書にエクスポート"""
         data = {
             "nodes": [],
             "edges": []
@@ -2147,36 +2293,47 @@ class MindMapView(QGraphicsView):
         
         # ノード情報を収集
         node_id_map = {}
-        for i, item in enumerate(self.scene.items()):
-            if isinstance(item, NodeItem):
-                node_id = f"node_{i}"
-                node_id_map[item] = node_id
-                data["nodes"].append({
-                    "id": node_id,
-                    "text": item.text_item.toPlainText(),
-                    "x": item.pos().x(),
-                    "y": item.pos().y()
-                })
+        for i, item in enumerate(self._node_items):
+            node_id = f"node_{i}"
+            node_id_map[item] = node_id
+            data["nodes"].append({
+                "id": node_id,
+                "text": item.text_item.toPlainText(),
+                "x": item.pos().x(),
+                "y": item.pos().y()
+            })
         
         # エッジ情報を収集
-        for item in self.scene.items():
-            if isinstance(item, NodeItem):
-                for connection, other_node in item._edges:
-                    if item in node_id_map and other_node in node_id_map:
-                        data["edges"].append({
-                            "source": node_id_map[item],
-                            "target": node_id_map[other_node]
-                        })
-        
-        return json.dumps(data, ensure_ascii=False, indent=2)
-
-    def _import_from_json(self, json_str: str):
-        """JSONからインポート"""
+        for item in self._node_items:
+            for connection, other_node in item._edges:
+                if item in node_id_map and other_node in node_id_map:
+                    data["edges"].append({
+                        "source": node_id_map[item],
+                        "target": node_id_map[other_node]
+                    })
+        
+        return data
+
+    def _import_from_json(self, fp):
+        """JSONファイルから直接インポート"""
         try:
-            data = json.loads(json_str)
-            
-            # シーンをクリア
+            data = json.load(fp)
+        except Exception as e:
+            print(f"JSONインポートエラー: {e}")
+            return
+        self._import_from_dict(data)
+
+    def _import_from_dict(self, data: dict):
+        """辞書からインポート"""
+        try:
+            # シーンをクリア（シーン上のアイテムは破棄されるため接続リストも空にする）
             self.scene.clear()
+            self.connections.clear()
+            self._node_items.clear()
+            self._node_items_set.clear()
+            self._pending_edges.clear()
+            self._pending_edge_nodes.clear()
+            self._invalidate_level_index()
             if self.undo_stack:
                 self.undo_stack.clear()
             
@@ -2207,8 +2364,8 @@ class MindMapView(QGraphicsView):
                            node.boundingRect().height())
 
         # 他のノードとの衝突チェック（ノード同士の重なりを防ぐ）
-        for item in self.scene.items():
-            if isinstance(item, NodeItem) and item != node:
+        for item in self._node_items:
+            if item != node:
                 item_rect = item.sceneBoundingRect()
                 # ノード同士の重なりを防ぐための弾き幅
                 margin = 5  # 弾き幅=5px
@@ -2233,10 +2390,7 @@ class MindMapView(QGraphicsView):
                     continue
                 if connection.source is not node and connection.target is not node:
                     continue
-                if not hasattr(connection, 'vertical_line') or not connection.vertical_line:
-                    continue
-                line = connection.vertical_line.line()
-                line_x = line.x1()
+                line_x = connection.vertical_x
                 # ノード矩形が縦線のX位置に被っているか（Y方向は自由）
                 if (target_rect.left() <= line_x + margin and
                     target_rect.right() >= line_x - margin):
@@ -2251,8 +2405,8 @@ class MindMapView(QGraphicsView):
         try:
             insertion_threshold = 15.0  # 15px以内
             
-            for item in self.scene.items():
-                if isinstance(item, NodeItem) and item != dragged_node:
+            for item in self._node_items:
+                if item != dragged_node:
                     # ドラッグ中のノードがこのノードの子かどうかチェック
                     is_child = False
                     for connection in self.connections:
@@ -2359,7 +2513,7 @@ class MindMapView(QGraphicsView):
         """
         try:
             lane_width = 60.0  # ドロップX±lane_width内を同じ縦レーンとみなす
-            candidates = [item for item in self.scene.items() if isinstance(item, NodeItem) and item is not dragged_node]
+            candidates = [item for item in self._node_items if item is not dragged_node]
             if not candidates:
                 return False, [], 0
             lane_nodes = [n for n in candidates if abs(n.pos().x() - target_pos.x()) <= lane_width]
@@ -2505,32 +2659,26 @@ class MindMapView(QGraphicsView):
     def _check_connection_line_collision(self, node: 'NodeItem', target_rect: QRectF) -> bool:
         """接続線との衝突をチェック（X軸方向のみ、Y軸方向は完全に自由）"""
         for connection in self.connections:
-            if hasattr(connection, 'vertical_line') and connection.vertical_line:
-                # 垂直線の位置を取得
-                line = connection.vertical_line.line()
-                # X軸方向のみの衝突チェック（Y軸方向は完全に自由）
-                margin = 1  # X軸方向のマージンを最小限に
-                line_x = line.x1()
-                
-                # ノードが垂直線のX軸位置と重なる場合のみ衝突とみなす
-                # Y軸方向の重なりは完全に無視
-                if (target_rect.left() <= line_x + margin and 
-                    target_rect.right() >= line_x - margin):
-                    return True
-                    
+            # 垂直線の位置を取得
+            line_x = connection.vertical_x
+            # X軸方向のみの衝突チェック（Y軸方向は完全に自由）
+            margin = 1  # X軸方向のマージンを最小限に
+            
+            # ノードが垂直線のX軸位置と重なる場合のみ衝突とみなす
+            # Y軸方向の重なりは完全に無視
+            if (target_rect.left() <= line_x + margin and 
+                target_rect.right() >= line_x - margin):
+                return True
+            
             # horizontal_line2との衝突もチェック（X軸方向のみ）
-            if hasattr(connection, 'horizontal_line2') and connection.horizontal_line2:
-                line2 = connection.horizontal_line2.line()
-                # X軸方向のみの衝突チェック
-                margin = 1
-                line2_x_start = min(line2.x1(), line2.x2())
-                line2_x_end = max(line2.x1(), line2.x2())
-                
-                # ノードが水平線2のX軸範囲と重なる場合のみ衝突とみなす
-                # Y軸方向の重なりは完全に無視
-                if (target_rect.left() <= line2_x_end + margin and 
-                    target_rect.right() >= line2_x_start - margin):
-                    return True
+            line2_x_start = min(connection.vertical_x, connection.end_x)
+            line2_x_end = max(connection.vertical_x, connection.end_x)
+            
+            # ノードが水平線2のX軸範囲と重なる場合のみ衝突とみなす
+            # Y軸方向の重なりは完全に無視
+            if (target_rect.left() <= line2_x_end + margin and 
+                target_rect.right() >= line2_x_start - margin):
+                return True
         return False
 
     def _check_subtree_collision(self, root_node: 'NodeItem') -> bool:
@@ -2553,8 +2701,8 @@ class MindMapView(QGraphicsView):
 
             # 他ノードとの衝突検出の弾き幅
             margin = 5
-            for item in self.scene.items():
-                if isinstance(item, NodeItem) and item not in subtree_nodes:
+            for item in self._node_items:
+                if item not in subtree_nodes:
                     item_rect = item.sceneBoundingRect()
                     expanded_rect = QRectF(
                         item_rect.x() - margin,
@@ -2572,23 +2720,26 @@ class MindMapView(QGraphicsView):
             return False
 
     def set_theme(self, theme: dict):
-        """テーマを設定"""
-        self.current_theme = theme
+        """テーマを設定（変更のあったキーのみを受け取り、現在のテーマに反映する）"""
+        if not theme:
+            return
+        self.current_theme = {**self.current_theme, **theme}
         
         # シーンの背景色を更新
         if "background" in theme:
             from PySide6.QtGui import QColor
             bg_color = QColor(theme["background"])
-            self.scene.setBackgroundBrush(QBrush(bg_color))
+            self._set_scene_background(QBrush(bg_color))
         
-        # 既存のノードの色を更新
-        for item in self.scene.items():
-            if isinstance(item, NodeItem):
-                item.update_theme(theme)
+        # ノードの配色が変わった場合のみ既存のノードを更新（ノードには全ての配色を渡す）
+        if not _NODE_THEME_KEYS.isdisjoint(theme):
+            for item in self._node_items:
+                item.update_theme(self.current_theme)
         
         # 接続線の色も更新
-        for connection in self.connections:
-            if hasattr(connection, 'update_theme'):
-                connection.update_theme(theme)
+        if "node_border" in theme:
+            for connection in self.connections:
+                if hasattr(connection, 'update_theme'):
+                    connection.update_theme(theme)
         
         self.scene.update()